@@ -0,0 +1,140 @@
+import uuid
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+def fill_user_fields(apps, schema_editor):
+    """Новая роль клиентов и уникальные токены для уже зарегистрированных пользователей"""
+    User = apps.get_model('accounts', 'User')
+
+    User.objects.filter(role='user').update(role='customer')
+    users = []
+    for user in User.objects.only('id').iterator(chunk_size=2000):
+        user.email_verification_token = uuid.uuid4()
+        users.append(user)
+    User.objects.bulk_update(users, ['email_verification_token'], batch_size=2000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='user',
+            options={'verbose_name': 'Пользователь', 'verbose_name_plural': 'Пользователи'},
+        ),
+        migrations.RemoveField(
+            model_name='user',
+            name='address',
+        ),
+        migrations.RenameField(
+            model_name='user',
+            old_name='birth_date',
+            new_name='date_of_birth',
+        ),
+        migrations.RenameField(
+            model_name='user',
+            old_name='is_verified',
+            new_name='email_verified',
+        ),
+        migrations.AlterField(
+            model_name='user',
+            name='email_verified',
+            field=models.BooleanField(default=False, verbose_name='Email подтвержден'),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='email_notifications',
+            field=models.BooleanField(default=True, verbose_name='Email уведомления'),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='sms_notifications',
+            field=models.BooleanField(default=True, verbose_name='SMS уведомления'),
+        ),
+        # Токен добавляется без ограничения уникальности до заполнения существующих строк
+        migrations.AddField(
+            model_name='user',
+            name='email_verification_token',
+            field=models.UUIDField(null=True, verbose_name='Токен подтверждения email'),
+        ),
+        migrations.AlterField(
+            model_name='user',
+            name='email',
+            field=models.EmailField(max_length=254, unique=True, verbose_name='Email'),
+        ),
+        migrations.AlterField(
+            model_name='user',
+            name='role',
+            field=models.CharField(choices=[('customer', 'Клиент'), ('staff', 'Персонал'), ('admin', 'Администратор')], default='customer', max_length=20, verbose_name='Роль'),
+        ),
+        migrations.RunPython(fill_user_fields, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='user',
+            name='email_verification_token',
+            field=models.UUIDField(default=uuid.uuid4, unique=True, verbose_name='Токен подтверждения email'),
+        ),
+        migrations.RemoveField(
+            model_name='userprofile',
+            name='favorite_table',
+        ),
+        migrations.RemoveField(
+            model_name='userprofile',
+            name='notes',
+        ),
+        migrations.RemoveField(
+            model_name='userprofile',
+            name='preferences',
+        ),
+        migrations.AddField(
+            model_name='userprofile',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True, default=django.utils.timezone.now, verbose_name='Создан'),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='userprofile',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, verbose_name='Обновлен'),
+        ),
+        migrations.AddField(
+            model_name='userprofile',
+            name='dietary_restrictions',
+            field=models.TextField(blank=True, verbose_name='Диетические ограничения'),
+        ),
+        migrations.AddField(
+            model_name='userprofile',
+            name='favorite_table_zone',
+            field=models.CharField(blank=True, max_length=100, verbose_name='Любимая зона'),
+        ),
+        migrations.AddField(
+            model_name='userprofile',
+            name='special_occasions',
+            field=models.TextField(blank=True, verbose_name='Особые случаи'),
+        ),
+        migrations.AddField(
+            model_name='userprofile',
+            name='total_bookings',
+            field=models.PositiveIntegerField(default=0, verbose_name='Всего бронирований'),
+        ),
+        migrations.AddField(
+            model_name='userprofile',
+            name='vip_status',
+            field=models.BooleanField(default=False, verbose_name='VIP статус'),
+        ),
+        migrations.AlterField(
+            model_name='userprofile',
+            name='total_spent',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=10, verbose_name='Потрачено всего'),
+        ),
+        migrations.AlterField(
+            model_name='userprofile',
+            name='user',
+            field=models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='profile', to=settings.AUTH_USER_MODEL, verbose_name='Пользователь'),
+        ),
+    ]
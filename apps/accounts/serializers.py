@@ -1,5 +1,6 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
+from django.contrib.auth.password_validation import validate_password
 from .models import UserProfile
 
 User = get_user_model()
@@ -25,7 +26,7 @@ class UserSerializer(serializers.ModelSerializer):
         fields = [
             'id', 'username', 'email', 'first_name', 'last_name', 'phone', 'role',
             'email_verified', 'date_of_birth', 'avatar', 'email_notifications',
-            'sms_notifications', 'created_at', 'profile'
+            'sms_notifications', 'created_at', 'profile', 'password'
         ]
         read_only_fields = ['id', 'role', 'email_verified', 'created_at']
         extra_kwargs = {
@@ -69,3 +70,17 @@ class EmailVerificationSerializer(serializers.Serializer):
             return value
         except User.DoesNotExist:
             raise serializers.ValidationError('Неверный или уже использованный токен')
+
+class ChangePasswordSerializer(serializers.Serializer):
+    """Сериализатор для смены пароля"""
+    current_password = serializers.CharField(write_only=True)
+    new_password = serializers.CharField(write_only=True)
+    
+    def validate_current_password(self, value):
+        if not self.context['request'].user.check_password(value):
+            raise serializers.ValidationError('Неверный текущий пароль')
+        return value
+    
+    def validate_new_password(self, value):
+        validate_password(value, self.context['request'].user)
+        return value
@@ -0,0 +1,47 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+User = get_user_model()
+
+class UserListQueriesTest(TestCase):
+    """Число запросов списков пользователей не зависит от числа строк"""
+
+    API_QUERIES = {
+        '/api/accounts/users/': 1,
+    }
+    # Сессия, пользователь, счетчики changelist и фильтры
+    ADMIN_QUERIES = {
+        '/admin/accounts/user/': 6,
+        '/admin/accounts/userprofile/': 8,
+    }
+
+    def setUp(self):
+        admin = User.objects.create_superuser(email='admin@example.com', username='admin', password='password')
+        self.api_client = APIClient()
+        self.api_client.force_authenticate(admin)
+        self.admin_client = APIClient()
+        self.admin_client.force_login(admin)
+        self._add_users(1)
+
+    def _add_users(self, count):
+        offset = User.objects.count()
+        for number in range(offset, offset + count):
+            # Профиль создается сигналом post_save
+            User.objects.create_user(email=f'guest{number}@example.com', username=f'guest{number}', password='password')
+
+    def _assert_queries(self, client, expected):
+        for url, queries in expected.items():
+            with self.subTest(url=url), self.assertNumQueries(queries):
+                response = client.get(url)
+                self.assertEqual(response.status_code, 200)
+
+    def test_api_lists(self):
+        self._assert_queries(self.api_client, self.API_QUERIES)
+        self._add_users(5)
+        self._assert_queries(self.api_client, self.API_QUERIES)
+
+    def test_admin_changelists(self):
+        self._assert_queries(self.admin_client, self.ADMIN_QUERIES)
+        self._add_users(5)
+        self._assert_queries(self.admin_client, self.ADMIN_QUERIES)
@@ -3,18 +3,48 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from django.shortcuts import get_object_or_404
 from django.contrib.auth import get_user_model
+from apps.core.eager_loading import EagerLoadingMixin
 from .models import UserProfile
-from .serializers import UserSerializer, UserProfileSerializer, EmailVerificationSerializer
+from .serializers import UserSerializer, UserProfileSerializer, EmailVerificationSerializer, ChangePasswordSerializer
 
 User = get_user_model()
 
-class UserProfileView(generics.RetrieveUpdateAPIView):
+class UserProfileView(EagerLoadingMixin, generics.RetrieveUpdateAPIView):
     """Просмотр и редактирование профиля пользователя"""
+    queryset = User.objects.all()
     serializer_class = UserSerializer
     permission_classes = [permissions.IsAuthenticated]
     
     def get_object(self):
-        return self.request.user
+        # Профиль загружается тем же запросом, что и пользователь
+        return self.get_queryset().get(pk=self.request.user.pk)
+
+class UserListView(EagerLoadingMixin, generics.ListAPIView):
+    """Список пользователей (для администраторов)"""
+    queryset = User.objects.all().order_by('-date_joined')
+    serializer_class = UserSerializer
+    permission_classes = [permissions.IsAdminUser]
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def current_user(request):
+    """Текущий пользователь"""
+    serializer = UserSerializer(request.user)
+    return Response(serializer.data)
+
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
+def change_password(request):
+    """Смена пароля текущего пользователя"""
+    serializer = ChangePasswordSerializer(data=request.data, context={'request': request})
+    if serializer.is_valid():
+        user = request.user
+        user.set_password(serializer.validated_data['new_password'])
+        user.save(update_fields=['password'])
+        
+        return Response({'message': 'Пароль успешно изменен'})
+    
+    return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 @api_view(['POST'])
 @permission_classes([permissions.AllowAny])
@@ -1,7 +1,7 @@
 from django.contrib import admin
 from django.utils.html import format_html
 from django.utils import timezone
-from .models import Booking, BookingMenuItem, BookingHistory
+from .models import Booking, BookingMenuItem, BookingHistory, BookingDailyStats, BookingReminder, NotificationOutbox
 
 class BookingMenuItemInline(admin.TabularInline):
     """Инлайн для предзаказанных блюд"""
@@ -9,6 +9,17 @@ class BookingMenuItemInline(admin.TabularInline):
     extra = 0
     readonly_fields = ['total_price']
 
+class BookingReminderInline(admin.TabularInline):
+    """Инлайн для запланированных напоминаний"""
+    model = BookingReminder
+    extra = 0
+    can_delete = False
+    readonly_fields = ['offset_minutes', 'due_at', 'sent_at', 'attempts', 'last_error']
+    
+    def has_add_permission(self, request, obj=None):
+        # Напоминания планируются автоматически
+        return False
+
 class BookingHistoryInline(admin.TabularInline):
     """Инлайн для истории бронирования"""
     model = BookingHistory
@@ -42,7 +53,7 @@ class BookingAdmin(admin.ModelAdmin):
         }),
     )
     
-    inlines = [BookingMenuItemInline, BookingHistoryInline]
+    inlines = [BookingMenuItemInline, BookingReminderInline, BookingHistoryInline]
     
     actions = ['confirm_bookings', 'cancel_bookings', 'complete_bookings']
     
@@ -83,7 +94,10 @@ class BookingMenuItemAdmin(admin.ModelAdmin):
     search_fields = ['booking__user__email', 'menu_item__name']
     
     def get_queryset(self, request):
-        return super().get_queryset(request).select_related('booking', 'menu_item', 'booking__user')
+        # __str__ бронирования и блюда обращаются к столику с зоной и к категории
+        return super().get_queryset(request).select_related(
+            'booking__table__zone', 'booking__user', 'menu_item__category'
+        )
 
 @admin.register(BookingHistory)
 class BookingHistoryAdmin(admin.ModelAdmin):
@@ -95,4 +109,39 @@ class BookingHistoryAdmin(admin.ModelAdmin):
     readonly_fields = ['created_at']
     
     def get_queryset(self, request):
-        return super().get_queryset(request).select_related('booking', 'changed_by')
+        return super().get_queryset(request).select_related('booking__table__zone', 'changed_by')
+
+@admin.register(BookingDailyStats)
+class BookingDailyStatsAdmin(admin.ModelAdmin):
+    """Админ-панель для дневной сводки бронирований"""
+    
+    list_display = ['date', 'status', 'zone', 'bookings_count', 'guests_count', 'revenue']
+    list_filter = ['status', 'zone', 'date']
+    date_hierarchy = 'date'
+    
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('zone')
+    
+    def has_add_permission(self, request):
+        # Сводка ведется автоматически
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+
+@admin.register(NotificationOutbox)
+class NotificationOutboxAdmin(admin.ModelAdmin):
+    """Админ-панель для очереди уведомлений"""
+    
+    list_display = ['id', 'task', 'booking', 'coalesced_count', 'attempts', 'available_at', 'dispatched_at', 'created_at']
+    list_filter = ['task', ('dispatched_at', admin.EmptyFieldListFilter)]
+    search_fields = ['booking__booking_number', 'last_error']
+    readonly_fields = ['task', 'args', 'booking', 'coalesce_key', 'coalesced_count', 'attempts', 'last_error', 'dispatched_at', 'created_at']
+    raw_id_fields = ['booking']
+    
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('booking__table__zone')
+    
+    def has_add_permission(self, request):
+        # Уведомления ставятся в очередь только кодом
+        return False
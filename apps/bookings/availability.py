@@ -0,0 +1,196 @@
+"""Движок доступности столиков на основе битовых масок занятости"""
+from datetime import datetime, time, timedelta
+from django.utils import timezone
+
+# Статусы, при которых бронирование занимает столик
+ACTIVE_BOOKING_STATUSES = ['pending', 'confirmed', 'active']
+
+DEFAULT_OPENING_TIME = time(10, 0)
+DEFAULT_CLOSING_TIME = time(22, 0)
+DEFAULT_BOOKING_INTERVAL = 30
+
+# Размер ячейки сетки. Границы бронирований и длительности задаются в минутах,
+# поэтому минутная сетка не округляет ни бронирования, ни длительность слота
+RESOLUTION = timedelta(minutes=1)
+
+def serialize_slot(start, end):
+    """Представление свободного слота в ответе API"""
+    local_start = timezone.localtime(start)
+    local_end = timezone.localtime(end)
+    return {
+        'start_time': local_start.strftime('%H:%M'),
+        'end_time': local_end.strftime('%H:%M'),
+        'datetime_start': local_start.isoformat(),
+        'datetime_end': local_end.isoformat(),
+    }
+
+def load_bookings(days, table_ids, exclude_pk=None):
+    """
+    Заполняет сетки нескольких дней одним запросом к БД.
+
+    Бронирование отмечается в каждой сетке, с рабочим временем
+    которой оно пересекается. exclude_pk — бронирование, которое
+    не учитывается (при его изменении).
+    """
+    from .models import Booking
+
+    table_ids = list(table_ids)
+    for day in days:
+        for table_id in table_ids:
+            day._occupancy.setdefault(table_id, 0)
+    if not days or not table_ids:
+        return
+
+    bookings = Booking.objects.filter(
+        table_id__in=table_ids,
+        status__in=ACTIVE_BOOKING_STATUSES,
+        start_time__lt=max(day.day_end for day in days),
+        end_time__gt=min(day.day_start for day in days),
+    )
+    if exclude_pk is not None:
+        bookings = bookings.exclude(pk=exclude_pk)
+
+    for table_id, start_time, end_time in bookings.values_list('table_id', 'start_time', 'end_time'):
+        for day in days:
+            if start_time < day.day_end and end_time > day.day_start:
+                day.occupy(table_id, start_time, end_time)
+
+def find_next_available(table_ids, start_date, end_date, duration, limit,
+                        settings=None, not_before=None, batch_days=7):
+    """
+    Ближайшие свободные варианты (start, end, table_id) в диапазоне дат.
+
+    Бронирования загружаются пачками по batch_days дней, поиск
+    останавливается, как только набрано limit вариантов, поэтому
+    время ответа не зависит от длины горизонта бронирования.
+    """
+    table_ids = list(table_ids)
+    options = []
+    batch_start = start_date
+    while table_ids and batch_start <= end_date:
+        batch_end = min(batch_start + timedelta(days=batch_days - 1), end_date)
+        days = [
+            DayAvailability.from_settings(batch_start + timedelta(days=offset), settings)
+            for offset in range((batch_end - batch_start).days + 1)
+        ]
+        load_bookings(days, table_ids)
+
+        for day in days:
+            day_options = [
+                (slot_start, slot_end, table_id)
+                for table_id in table_ids
+                for slot_start, slot_end in day.free_slots(table_id, duration, not_before=not_before)
+            ]
+            # Сортировка устойчива: при равном времени порядок столиков сохраняется
+            day_options.sort(key=lambda option: option[0])
+            options.extend(day_options[:limit - len(options)])
+            if len(options) >= limit:
+                return options
+
+        batch_start = batch_end + timedelta(days=1)
+    return options
+
+class DayAvailability:
+    """
+    Сетка занятости столиков на один рабочий день.
+
+    Рабочий день делится на ячейки длиной ``RESOLUTION``.
+    Занятость столика хранится как целое число: бит ``i`` установлен,
+    если ячейка ``i`` пересекается хотя бы с одним бронированием.
+    Слоты начинаются через каждые ``booking_interval`` минут от открытия.
+    Поиск слотов сводится к операциям сдвига и ``AND`` над масками,
+    проверка нового бронирования — к одному ``AND``.
+    """
+
+    def __init__(self, date, opening_time, closing_time, interval):
+        tz = timezone.get_current_timezone()
+        self.date = date
+        self.interval = interval
+        self.step = timedelta(minutes=interval)
+        self.day_start = timezone.make_aware(datetime.combine(date, opening_time), tz)
+        closing_date = date if closing_time > opening_time else date + timedelta(days=1)
+        self.day_end = timezone.make_aware(datetime.combine(closing_date, closing_time), tz)
+        self.cells = -int(-(self.day_end - self.day_start) // RESOLUTION)
+        self._full_mask = (1 << self.cells) - 1
+        # Ячейки, с которых может начинаться слот
+        self._slot_starts = sum(1 << cell for cell in range(0, self.cells, max(1, self.step // RESOLUTION)))
+        self._occupancy = {}
+
+    @classmethod
+    def from_settings(cls, date, settings=None):
+        """Сетка на дату по настройкам ресторана (или значениям по умолчанию)"""
+        if settings:
+            return cls(date, settings.opening_time, settings.closing_time, settings.booking_interval)
+        return cls(date, DEFAULT_OPENING_TIME, DEFAULT_CLOSING_TIME, DEFAULT_BOOKING_INTERVAL)
+
+    @classmethod
+    def for_tables(cls, date, table_ids, settings=None):
+        """Сетка на дату с занятостью указанных столиков (один запрос к БД)"""
+        availability = cls.from_settings(date, settings)
+        availability.load_bookings(table_ids)
+        return availability
+
+    def load_bookings(self, table_ids, exclude_pk=None):
+        """Загружает бронирования столиков, пересекающиеся с рабочим днем"""
+        load_bookings([self], table_ids, exclude_pk=exclude_pk)
+
+    def _cell_range(self, start, end):
+        """Индексы ячеек [first, last), которые задевает интервал"""
+        first = int((start - self.day_start) // RESOLUTION)
+        last = -int(-(end - self.day_start) // RESOLUTION)
+        return max(first, 0), min(last, self.cells)
+
+    def _cells_mask(self, first, last):
+        if first >= last:
+            return 0
+        return ((1 << (last - first)) - 1) << first
+
+    def occupy(self, table_id, start, end):
+        """Отмечает интервал как занятый"""
+        mask = self._cells_mask(*self._cell_range(start, end))
+        self._occupancy[table_id] = self._occupancy.get(table_id, 0) | mask
+
+    def occupancy(self, table_id):
+        """Битовая маска занятости столика"""
+        return self._occupancy.get(table_id, 0)
+
+    def cells_for(self, duration):
+        """Количество ячеек, необходимое для бронирования длительностью duration минут"""
+        return max(1, -int(-timedelta(minutes=duration) // RESOLUTION))
+
+    def _window_starts(self, occupied, length):
+        """Маска ячеек, с которых начинается свободное окно длиной length ячеек"""
+        if length > self.cells:
+            return 0
+        mask = ~occupied & self._full_mask
+        span = 1
+        # Удваиваем длину окна: после шага бит i означает свободу ячеек i..i+span-1
+        while span < length:
+            shift = min(span, length - span)
+            mask &= mask >> shift
+            span += shift
+        return mask & ((1 << (self.cells - length + 1)) - 1)
+
+    def free_slots(self, table_id, duration, not_before=None):
+        """Список свободных интервалов (start, end) длительностью duration минут"""
+        starts = self._window_starts(self.occupancy(table_id), self.cells_for(duration)) & self._slot_starts
+        length = timedelta(minutes=duration)
+        slots = []
+        while starts:
+            low_bit = starts & -starts
+            start = self.day_start + RESOLUTION * (low_bit.bit_length() - 1)
+            # Окно может заходить в неполную последнюю ячейку
+            if start + length > self.day_end:
+                break
+            if not_before is None or start >= not_before:
+                slots.append((start, start + length))
+            starts ^= low_bit
+        return slots
+
+    def within_hours(self, start, end):
+        """Лежит ли интервал внутри рабочего времени"""
+        return self.day_start <= start and end <= self.day_end
+
+    def is_free(self, table_id, start, end):
+        """Свободен ли столик весь интервал (интервал внутри рабочего времени)"""
+        return not self.occupancy(table_id) & self._cells_mask(*self._cell_range(start, end))
@@ -0,0 +1,166 @@
+"""
+Потоковая выгрузка бронирований, позиций предзаказа и платежей для бухгалтерии.
+
+Строки читаются через values_list(...).iterator(chunk_size) серверным
+курсором: связанные колонки (столик, зона, email пользователя, блюда)
+приходят в том же запросе через JOIN, модели не создаются, а в памяти
+одновременно находится только одна порция строк.
+"""
+import csv
+import io
+import json
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from itertools import islice
+from django.contrib.postgres.aggregates import StringAgg
+from django.utils import timezone
+from .models import Booking, BookingMenuItem, Payment
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+EXPORT_CHUNK_SIZE = 2000
+
+EXPORT_FORMATS = {
+    'csv': 'text/csv; charset=utf-8',
+    'ndjson': 'application/x-ndjson',
+}
+
+# Колонки выгрузки: (заголовок, выражение для values_list)
+BOOKING_COLUMNS = [
+    ('id', 'id'),
+    ('booking_number', 'booking_number'),
+    ('date', 'date'),
+    ('start_time', 'start_time'),
+    ('end_time', 'end_time'),
+    ('status', 'status'),
+    ('payment_status', 'payment_status'),
+    ('guests_count', 'guests_count'),
+    ('table', 'table__name'),
+    ('zone', 'table__zone__name'),
+    ('user_email', 'user__email'),
+    ('contact_name', 'contact_name'),
+    ('contact_phone', 'contact_phone'),
+    ('table_price', 'table_price'),
+    ('deposit_amount', 'deposit_amount'),
+    ('total_amount', 'total_amount'),
+    ('dishes', 'dishes'),
+    ('created_at', 'created_at'),
+]
+
+BOOKING_MENU_ITEM_COLUMNS = [
+    ('id', 'id'),
+    ('booking_id', 'booking_id'),
+    ('booking_number', 'booking__booking_number'),
+    ('date', 'booking__date'),
+    ('table', 'booking__table__name'),
+    ('zone', 'booking__table__zone__name'),
+    ('user_email', 'booking__user__email'),
+    ('dish', 'menu_item__name'),
+    ('quantity', 'quantity'),
+    ('price_per_item', 'price_per_item'),
+    ('notes', 'notes'),
+]
+
+PAYMENT_COLUMNS = [
+    ('id', 'id'),
+    ('payment_id', 'payment_id'),
+    ('external_id', 'external_id'),
+    ('booking_id', 'booking_id'),
+    ('booking_number', 'booking__booking_number'),
+    ('booking_date', 'booking__date'),
+    ('table', 'booking__table__name'),
+    ('zone', 'booking__table__zone__name'),
+    ('user_email', 'booking__user__email'),
+    ('amount', 'amount'),
+    ('method', 'method'),
+    ('status', 'status'),
+    ('created_at', 'created_at'),
+    ('completed_at', 'completed_at'),
+]
+
+def _bookings(date_from, date_to):
+    return Booking.objects.filter(date__range=(date_from, date_to)).annotate(
+        # Названия блюд предзаказа агрегируются в том же запросе
+        dishes=StringAgg('menu_items__menu_item__name', delimiter='; ', ordering='menu_items__id', default='')
+    ).order_by('date', 'start_time', 'id')
+
+def _booking_menu_items(date_from, date_to):
+    return BookingMenuItem.objects.filter(
+        booking__date__range=(date_from, date_to)
+    ).order_by('booking__date', 'booking_id', 'id')
+
+def _day_start(value):
+    return timezone.make_aware(datetime.combine(value, time.min))
+
+def _payments(date_from, date_to):
+    # Диапазон по created_at без __date, чтобы работал индекс (created_at, id)
+    return Payment.objects.filter(
+        created_at__gte=_day_start(date_from),
+        created_at__lt=_day_start(date_to + timedelta(days=1)),
+    ).order_by('created_at', 'id')
+
+EXPORT_DATASETS = {
+    'bookings': (_bookings, BOOKING_COLUMNS),
+    'menu-items': (_booking_menu_items, BOOKING_MENU_ITEM_COLUMNS),
+    'payments': (_payments, PAYMENT_COLUMNS),
+}
+
+def _export_value(value):
+    """Значение колонки в виде, не теряющем точность (Decimal - строкой)"""
+    if isinstance(value, datetime):
+        return timezone.localtime(value).isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+def export_rows(dataset, date_from, date_to, chunk_size=EXPORT_CHUNK_SIZE):
+    """Заголовки и итератор порций строк выгрузки"""
+    build_queryset, columns = EXPORT_DATASETS[dataset]
+    rows = build_queryset(date_from, date_to).values_list(
+        *[lookup for _, lookup in columns]
+    ).iterator(chunk_size=chunk_size)
+
+    def chunks():
+        while True:
+            chunk = list(islice(rows, chunk_size))
+            if not chunk:
+                return
+            yield [[_export_value(value) for value in row] for row in chunk]
+
+    return [header for header, _ in columns], chunks()
+
+def _dumps(data):
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, ensure_ascii=False).encode()
+
+def iter_export(dataset, date_from, date_to, output='csv', chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Байтовые фрагменты выгрузки в формате csv или ndjson.
+
+    CSV начинается с BOM, чтобы Excel правильно открывал кириллицу.
+    """
+    headers, chunks = export_rows(dataset, date_from, date_to, chunk_size)
+
+    if output == 'ndjson':
+        for chunk in chunks:
+            yield b''.join(_dumps(dict(zip(headers, row))) + b'\n' for row in chunk)
+        return
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(headers)
+    yield '\ufeff'.encode() + buffer.getvalue().encode()
+    for chunk in chunks:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(chunk)
+        yield buffer.getvalue().encode()
+
+def export_filename(dataset, date_from, date_to, output):
+    return f'{dataset}_{date_from.isoformat()}_{date_to.isoformat()}.{output}'
@@ -0,0 +1,78 @@
+"""
+Пакетная отправка писем о бронированиях.
+
+Письма рендерятся порциями, а каждая порция уходит через одно
+SMTP-соединение (get_connection + send_messages) вместо отдельной
+TLS-сессии на каждое письмо, как при send_mail.
+"""
+import logging
+import time
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.template.loader import get_template
+
+logger = logging.getLogger(__name__)
+
+SITE_NAME = 'Restaurant Logan'
+
+def build_reminder_message(booking, template, connection=None):
+    """Письмо-напоминание о бронировании (HTML-версия во вложении alternatives)"""
+    message = EmailMultiAlternatives(
+        subject=f'Напоминание о бронировании #{booking.booking_number}',
+        body='',
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        to=[booking.contact_email],
+        connection=connection,
+    )
+    message.attach_alternative(template.render({'booking': booking, 'site_name': SITE_NAME}), 'text/html')
+    return message
+
+def send_messages_batch(messages, connection=None):
+    """
+    Отправка порции писем через одно соединение.
+
+    messages - список пар (ключ, письмо). Ошибка одного письма не
+    прерывает порцию: возвращается число отправленных писем и ключи
+    неотправленных. После ошибки соединение открывается заново.
+    """
+    connection = connection or get_connection(fail_silently=False)
+    sent = 0
+    failed = []
+    started = time.monotonic()
+
+    with connection:
+        for key, message in messages:
+            try:
+                sent += connection.send_messages([message]) or 0
+            except Exception:
+                logger.exception('Не удалось отправить письмо %s', key)
+                failed.append(key)
+                # Соединение могло быть разорвано: открываем заново для остальных писем
+                connection.close()
+                try:
+                    connection.open()
+                except Exception:
+                    logger.exception('Не удалось переоткрыть соединение с почтовым сервером')
+
+    elapsed = time.monotonic() - started
+    return {
+        'sent': sent,
+        'failed': failed,
+        'seconds': round(elapsed, 3),
+        'per_second': round(sent / elapsed, 1) if elapsed else float(sent),
+    }
+
+def send_reminder_chunk(bookings, connection=None):
+    """Рендер и отправка напоминаний для порции бронирований"""
+    template = get_template('emails/booking_reminder.html')
+    messages = [
+        (booking.pk, build_reminder_message(booking, template))
+        for booking in bookings
+        if booking.contact_email
+    ]
+    report = send_messages_batch(messages, connection)
+    logger.info(
+        'Напоминания: отправлено %s из %s за %s с (%s писем/с), ошибок %s',
+        report['sent'], len(messages), report['seconds'], report['per_second'], len(report['failed'])
+    )
+    return report
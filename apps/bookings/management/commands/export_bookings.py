@@ -0,0 +1,38 @@
+import sys
+from datetime import date
+from django.core.management.base import BaseCommand, CommandError
+from apps.bookings.export import EXPORT_DATASETS, EXPORT_FORMATS, EXPORT_CHUNK_SIZE, iter_export
+
+class Command(BaseCommand):
+    help = 'Потоковая выгрузка бронирований, блюд предзаказа или платежей в CSV/NDJSON'
+
+    def add_arguments(self, parser):
+        parser.add_argument('dataset', choices=list(EXPORT_DATASETS), help='Что выгружать')
+        parser.add_argument('--from', dest='date_from', required=True, help='Начальная дата (YYYY-MM-DD)')
+        parser.add_argument('--to', dest='date_to', required=True, help='Конечная дата (YYYY-MM-DD)')
+        parser.add_argument('--format', dest='output', choices=list(EXPORT_FORMATS), default='csv', help='Формат файла')
+        parser.add_argument('--file', help='Путь к файлу (по умолчанию stdout)')
+        parser.add_argument('--chunk-size', type=int, default=EXPORT_CHUNK_SIZE, help='Размер порции строк')
+
+    def handle(self, *args, **options):
+        try:
+            date_from = date.fromisoformat(options['date_from'])
+            date_to = date.fromisoformat(options['date_to'])
+        except ValueError:
+            raise CommandError('Даты должны быть в формате YYYY-MM-DD')
+        if date_from > date_to:
+            raise CommandError('Начальная дата позже конечной')
+
+        fragments = iter_export(options['dataset'], date_from, date_to, options['output'], options['chunk_size'])
+        if not options['file']:
+            for fragment in fragments:
+                sys.stdout.buffer.write(fragment)
+            sys.stdout.buffer.flush()
+            return
+
+        size = 0
+        with open(options['file'], 'wb') as output:
+            for fragment in fragments:
+                output.write(fragment)
+                size += len(fragment)
+        self.stderr.write(self.style.SUCCESS(f'✅ Выгрузка записана в {options["file"]}: {size} байт'))
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from apps.bookings.stats import rebuild_daily_stats
+
+class Command(BaseCommand):
+    help = 'Пересчитывает дневную сводку бронирований (BookingDailyStats)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--from', dest='date_from', help='Начальная дата (YYYY-MM-DD)')
+        parser.add_argument('--to', dest='date_to', help='Конечная дата (YYYY-MM-DD)')
+
+    def handle(self, *args, **options):
+        rows = rebuild_daily_stats(options['date_from'], options['date_to'])
+        self.stdout.write(self.style.SUCCESS(f'✅ Сводка пересчитана: {rows} строк'))
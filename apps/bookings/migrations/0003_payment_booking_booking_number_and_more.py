@@ -0,0 +1,94 @@
+import uuid
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def fill_booking_fields(apps, schema_editor):
+    """Уникальные номера и токены для бронирований, созданных до появления полей"""
+    Booking = apps.get_model('bookings', 'Booking')
+
+    bookings = []
+    for booking in Booking.objects.only('id').iterator(chunk_size=2000):
+        # Старые номера были восьмизначными числами, новые коды начинаются с буквы
+        booking.booking_number = f'{booking.id:08d}'
+        booking.email_confirmation_token = uuid.uuid4()
+        bookings.append(booking)
+    Booking.objects.bulk_update(bookings, ['booking_number', 'email_confirmation_token'], batch_size=2000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0002_rename_price_bookingmenuitem_price_per_item_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Payment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('payment_id', models.CharField(max_length=100, unique=True, verbose_name='ID платежа')),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=10, verbose_name='Сумма')),
+                ('method', models.CharField(choices=[('click', 'Click'), ('payme', 'Payme'), ('uzcard', 'UzCard'), ('humo', 'Humo'), ('cash', 'Наличные')], max_length=20, verbose_name='Способ оплаты')),
+                ('status', models.CharField(choices=[('pending', 'Ожидает оплаты'), ('processing', 'Обрабатывается'), ('completed', 'Завершен'), ('failed', 'Неудачный'), ('cancelled', 'Отменен'), ('refunded', 'Возвращен')], default='pending', max_length=20, verbose_name='Статус')),
+                ('external_id', models.CharField(blank=True, max_length=100, verbose_name='Внешний ID')),
+                ('provider_data', models.JSONField(blank=True, default=dict, verbose_name='Данные провайдера')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Создан')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Обновлен')),
+                ('completed_at', models.DateTimeField(blank=True, null=True, verbose_name='Завершен')),
+                ('booking', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='payments', to='bookings.booking', verbose_name='Бронирование')),
+            ],
+            options={
+                'verbose_name': 'Платеж',
+                'verbose_name_plural': 'Платежи',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.AddField(
+            model_name='booking',
+            name='deposit_amount',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=8, verbose_name='Сумма депозита'),
+        ),
+        migrations.AddField(
+            model_name='booking',
+            name='email_confirmed',
+            field=models.BooleanField(default=False, verbose_name='Email подтвержден'),
+        ),
+        migrations.AddField(
+            model_name='booking',
+            name='email_sent_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Email отправлен'),
+        ),
+        migrations.AddField(
+            model_name='booking',
+            name='payment_status',
+            field=models.CharField(choices=[('pending', 'Ожидает оплаты'), ('deposit_paid', 'Депозит оплачен'), ('fully_paid', 'Полностью оплачено'), ('refunded', 'Возвращено')], default='pending', max_length=20, verbose_name='Статус оплаты'),
+        ),
+        # Уникальные поля добавляются без ограничения: у существующих строк
+        # значение по умолчанию было бы одинаковым
+        migrations.AddField(
+            model_name='booking',
+            name='booking_number',
+            field=models.CharField(blank=True, max_length=20, verbose_name='Номер бронирования'),
+        ),
+        migrations.AddField(
+            model_name='booking',
+            name='email_confirmation_token',
+            field=models.UUIDField(null=True, verbose_name='Токен подтверждения email'),
+        ),
+        migrations.RunPython(fill_booking_fields, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='booking',
+            name='booking_number',
+            field=models.CharField(blank=True, max_length=20, unique=True, verbose_name='Номер бронирования'),
+        ),
+        migrations.AlterField(
+            model_name='booking',
+            name='email_confirmation_token',
+            field=models.UUIDField(default=uuid.uuid4, unique=True, verbose_name='Токен подтверждения email'),
+        ),
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['booking_number'], name='bookings_bo_booking_03d631_idx'),
+        ),
+    ]
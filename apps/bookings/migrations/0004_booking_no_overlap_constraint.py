@@ -0,0 +1,58 @@
+import apps.bookings.models
+import django.contrib.postgres.constraints
+import django.contrib.postgres.fields.ranges
+from django.contrib.postgres.operations import BtreeGistExtension
+from django.db import migrations, models
+
+ACTIVE_STATUSES = ('pending', 'confirmed', 'active')
+
+
+def check_overlapping_bookings(apps, schema_editor):
+    """Ограничение нельзя создать, пока в БД есть пересекающиеся активные бронирования"""
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT a.id, b.id
+            FROM bookings_booking a
+            JOIN bookings_booking b
+              ON b.table_id = a.table_id AND b.id > a.id
+             AND b.start_time < a.end_time AND a.start_time < b.end_time
+            WHERE a.status IN %s AND b.status IN %s
+            ORDER BY a.id, b.id
+            LIMIT 20
+            """,
+            [ACTIVE_STATUSES, ACTIVE_STATUSES],
+        )
+        conflicts = cursor.fetchall()
+    if conflicts:
+        raise RuntimeError(
+            'Найдены пересекающиеся активные бронирования одного столика (id): {}. '
+            'Отмените или перенесите лишние бронирования и повторите миграцию.'.format(
+                ', '.join(f'{first} и {second}' for first, second in conflicts)
+            )
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0003_payment_booking_booking_number_and_more'),
+    ]
+
+    operations = [
+        migrations.RunPython(check_overlapping_bookings, migrations.RunPython.noop),
+        # btree_gist нужен для сравнения table_id на равенство внутри GiST-индекса
+        BtreeGistExtension(),
+        migrations.AddConstraint(
+            model_name='booking',
+            constraint=django.contrib.postgres.constraints.ExclusionConstraint(
+                condition=models.Q(('status__in', ['pending', 'confirmed', 'active'])),
+                expressions=[
+                    (apps.bookings.models.TsTzRange('start_time', 'end_time', django.contrib.postgres.fields.ranges.RangeBoundary()), '&&'),
+                    ('table', '='),
+                ],
+                name='bookings_booking_no_overlap',
+                violation_error_message='Столик уже забронирован на это время',
+            ),
+        ),
+    ]
@@ -0,0 +1,17 @@
+from django.db import migrations
+from apps.bookings.numbering import BLOCK_SIZE, BOOKING_NUMBER_SEQUENCE
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0004_booking_no_overlap_constraint'),
+    ]
+
+    operations = [
+        # Шаг последовательности равен размеру блока, который резервирует аллокатор
+        migrations.RunSQL(
+            sql=f'CREATE SEQUENCE IF NOT EXISTS {BOOKING_NUMBER_SEQUENCE} INCREMENT BY {BLOCK_SIZE} START WITH 1',
+            reverse_sql=f'DROP SEQUENCE IF EXISTS {BOOKING_NUMBER_SEQUENCE}',
+        ),
+    ]
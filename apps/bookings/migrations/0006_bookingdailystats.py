@@ -0,0 +1,33 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('restaurant', '0001_initial'),
+        ('bookings', '0005_booking_number_sequence'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BookingDailyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(verbose_name='Дата')),
+                ('status', models.CharField(choices=[('pending', 'Ожидает подтверждения'), ('confirmed', 'Подтверждено'), ('active', 'Активно'), ('completed', 'Завершено'), ('cancelled', 'Отменено'), ('no_show', 'Не явился')], max_length=20, verbose_name='Статус')),
+                ('bookings_count', models.IntegerField(default=0, verbose_name='Количество бронирований')),
+                ('guests_count', models.IntegerField(default=0, verbose_name='Количество гостей')),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=12, verbose_name='Сумма')),
+                ('pending_payments_count', models.IntegerField(default=0, verbose_name='Ожидают оплаты')),
+                ('deposit_paid_count', models.IntegerField(default=0, verbose_name='Депозит оплачен')),
+                ('zone', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='booking_stats', to='restaurant.zone', verbose_name='Зона')),
+            ],
+            options={
+                'verbose_name': 'Сводка бронирований за день',
+                'verbose_name_plural': 'Сводки бронирований по дням',
+                'ordering': ['-date', 'status'],
+                'unique_together': {('date', 'status', 'zone')},
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0006_bookingdailystats'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['start_time', 'id'], name='bookings_start_time_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='bookinghistory',
+            index=models.Index(fields=['created_at', 'id'], name='bookings_history_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['created_at', 'id'], name='bookings_payment_created_idx'),
+        ),
+    ]
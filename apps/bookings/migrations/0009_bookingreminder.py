@@ -0,0 +1,51 @@
+from datetime import timedelta
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def plan_existing_reminders(apps, schema_editor):
+    """Напоминания для уже подтвержденных будущих бронирований"""
+    Booking = apps.get_model('bookings', 'Booking')
+    BookingReminder = apps.get_model('bookings', 'BookingReminder')
+    
+    now = timezone.now()
+    reminders = []
+    bookings = Booking.objects.filter(status='confirmed', start_time__gt=now).values_list('id', 'start_time')
+    for booking_id, start_time in bookings.iterator(chunk_size=2000):
+        for offset in settings.BOOKING_REMINDER_OFFSETS:
+            due_at = start_time - timedelta(minutes=offset)
+            if due_at > now:
+                reminders.append(BookingReminder(booking_id=booking_id, offset_minutes=offset, due_at=due_at))
+    BookingReminder.objects.bulk_create(reminders, batch_size=2000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0008_notificationoutbox'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BookingReminder',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('offset_minutes', models.PositiveIntegerField(verbose_name='За сколько минут до начала')),
+                ('due_at', models.DateTimeField(verbose_name='Время отправки')),
+                ('sent_at', models.DateTimeField(blank=True, null=True, verbose_name='Отправлено')),
+                ('booking', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reminders', to='bookings.booking', verbose_name='Бронирование')),
+            ],
+            options={
+                'verbose_name': 'Напоминание о бронировании',
+                'verbose_name_plural': 'Напоминания о бронированиях',
+                'ordering': ['due_at'],
+                'unique_together': {('booking', 'offset_minutes')},
+                'indexes': [
+                    models.Index(condition=models.Q(('sent_at__isnull', True)), fields=['due_at', 'id'], name='bookings_reminder_due_idx'),
+                ],
+            },
+        ),
+        migrations.RunPython(plan_existing_reminders, migrations.RunPython.noop),
+    ]
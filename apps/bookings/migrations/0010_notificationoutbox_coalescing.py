@@ -0,0 +1,25 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0009_bookingreminder'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notificationoutbox',
+            name='coalesce_key',
+            field=models.CharField(blank=True, max_length=200, verbose_name='Ключ объединения'),
+        ),
+        migrations.AddField(
+            model_name='notificationoutbox',
+            name='coalesced_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='Объединено уведомлений'),
+        ),
+        migrations.AddIndex(
+            model_name='notificationoutbox',
+            index=models.Index(condition=models.Q(('dispatched_at__isnull', True)), fields=['coalesce_key'], name='bookings_outbox_coalesce_idx'),
+        ),
+    ]
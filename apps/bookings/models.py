@@ -1,13 +1,26 @@
-from django.db import models
+from django.db import models, transaction, IntegrityError
+from django.db.models import F, Func, Q, Sum
 from django.utils.translation import gettext_lazy as _
 from django.contrib.auth import get_user_model
+from django.contrib.postgres.constraints import ExclusionConstraint
+from django.contrib.postgres.fields import DateTimeRangeField, RangeBoundary, RangeOperators
 from django.core.exceptions import ValidationError
 from django.utils import timezone
 from datetime import timedelta
+from decimal import Decimal
+from psycopg2 import errorcodes
 import uuid
+from .availability import ACTIVE_BOOKING_STATUSES
 
 User = get_user_model()
 
+BOOKING_OVERLAP_MESSAGE = _('Столик уже забронирован на это время')
+
+class TsTzRange(Func):
+    """Диапазон времени бронирования [start_time, end_time) для ограничения исключения"""
+    function = 'TSTZRANGE'
+    output_field = DateTimeRangeField()
+
 class Booking(models.Model):
     """Бронирования столиков"""
     
@@ -59,6 +72,8 @@ class Booking(models.Model):
     # Системная информация
     created_at = models.DateTimeField(_('Дата создания'), auto_now_add=True)
     updated_at = models.DateTimeField(_('Дата обновления'), auto_now=True)
+    # Растет при изменении предзаказа и платежей: вместе с updated_at задает ETag деталей
+    version = models.PositiveIntegerField(_('Версия'), default=0, editable=False)
     confirmed_at = models.DateTimeField(_('Дата подтверждения'), blank=True, null=True)
     cancelled_at = models.DateTimeField(_('Дата отмены'), blank=True, null=True)
     cancellation_reason = models.TextField(_('Причина отмены'), blank=True)
@@ -82,31 +97,80 @@ class Booking(models.Model):
             models.Index(fields=['user', 'start_time']),
             models.Index(fields=['status']),
             models.Index(fields=['booking_number']),
+            models.Index(fields=['start_time', 'id'], name='bookings_start_time_id_idx'),
+        ]
+        constraints = [
+            # Пересечения бронирований одного столика запрещает сама БД (GiST)
+            ExclusionConstraint(
+                name='bookings_booking_no_overlap',
+                expressions=[
+                    (TsTzRange('start_time', 'end_time', RangeBoundary()), RangeOperators.OVERLAPS),
+                    ('table', RangeOperators.EQUAL),
+                ],
+                condition=Q(status__in=ACTIVE_BOOKING_STATUSES),
+                violation_error_message=BOOKING_OVERLAP_MESSAGE,
+            ),
         ]
     
+    # Поля, значения которых запоминаются при загрузке из БД
+    TRACKED_FIELDS = [
+        'status', 'payment_status', 'table_id', 'date', 'start_time', 'end_time',
+        'guests_count', 'total_amount',
+    ]
+    
     def __str__(self):
         return f"Бронирование #{self.booking_number} - {self.table} на {self.start_time.strftime('%d.%m.%Y %H:%M')}"
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._take_snapshot()
+        return instance
+    
+    def refresh_from_db(self, using=None, fields=None):
+        super().refresh_from_db(using=using, fields=fields)
+        self._take_snapshot(fields)
+    
+    def _take_snapshot(self, fields=None):
+        """Запомнить текущие значения отслеживаемых полей (все или только fields)"""
+        tracked = self.TRACKED_FIELDS
+        if fields is not None:
+            attnames = {self._meta.get_field(name).attname for name in fields}
+            tracked = [name for name in tracked if name in attnames]
+        snapshot = dict(getattr(self, '_loaded_values', {}))
+        for name in tracked:
+            # Отложенные (deferred) поля не загружены и не отслеживаются
+            if name in self.__dict__:
+                snapshot[name] = self.__dict__[name]
+        self._loaded_values = snapshot
+    
+    def get_loaded_value(self, field_name, default=None):
+        """Значение отслеживаемого поля на момент загрузки из БД"""
+        return getattr(self, '_loaded_values', {}).get(field_name, default)
+    
+    def get_dirty_fields(self):
+        """Отслеживаемые поля, измененные после загрузки: {поле: старое значение}"""
+        return {
+            name: old_value
+            for name, old_value in getattr(self, '_loaded_values', {}).items()
+            if self.__dict__.get(name) != old_value
+        }
+    
+    def has_changed(self, field_name):
+        """Изменено ли отслеживаемое поле после загрузки"""
+        return field_name in self.get_dirty_fields()
+    
     def clean(self):
         """Валидация бронирования"""
         if self.start_time and self.end_time:
             if self.start_time >= self.end_time:
                 raise ValidationError(_('Время окончания должно быть позже времени начала'))
             
-            if self.start_time < timezone.now():
+            if self._state.adding and self.start_time < timezone.now():
                 raise ValidationError(_('Нельзя создать бронирование в прошлом'))
             
-            # Проверяем пересечения с другими бронированиями
-            overlapping_bookings = Booking.objects.filter(
-                table=self.table,
-                status__in=['confirmed', 'active', 'pending']
-            ).exclude(pk=self.pk)
-            
-            for booking in overlapping_bookings:
-                if (self.start_time < booking.end_time and self.end_time > booking.start_time):
-                    raise ValidationError(
-                        _('Столик уже забронирован на это время. Конфликт с бронированием #{}'.format(booking.booking_number))
-                    )
+            # Пересечения с другими бронированиями проверяет ограничение
+            # bookings_booking_no_overlap (validate_constraints и сама БД)
         
         if self.guests_count and self.table:
             if self.guests_count > self.table.capacity:
@@ -123,7 +187,8 @@ class Booking(models.Model):
                     )
                 )
     
-    def save(self, *args, **kwargs):
+    def populate_defaults(self):
+        """Заполнение вычисляемых полей перед сохранением"""
         # Генерируем номер бронирования
         if not self.booking_number:
             self.booking_number = self.generate_booking_number()
@@ -148,29 +213,68 @@ class Booking(models.Model):
         # Вычисляем депозит (50% от цены столика)
         if self.table_price and not self.deposit_amount:
             self.deposit_amount = self.table_price / 2
+    
+    def save(self, *args, **kwargs):
+        # Частичное сохранение служебных полей не требует повторной валидации и пересчета
+        if kwargs.get('update_fields') is not None:
+            self._save_checked(*args, **kwargs)
+            self._take_snapshot(kwargs['update_fields'])
+            return
         
-        # Вычисляем общую сумму (цена столика + предзаказанные блюда)
-        self.total_amount = self.table_price
+        self.populate_defaults()
         
-        self.full_clean()
-        super().save(*args, **kwargs)
+        # Вычисляем общую сумму (цена столика + предзаказанные блюда).
+        # У нового бронирования блюд в БД еще нет: сумму предзаказа заранее
+        # выставляет создающий код (services.create_booking)
+        if self._state.adding:
+            if not self.total_amount:
+                self.total_amount = self.table_price
+        else:
+            self.total_amount = self.table_price + self.menu_items_total()
+        
+        # Существование связанных объектов, уникальность и пересечения
+        # гарантирует сама БД (см. _save_checked), поэтому здесь без запросов
+        self.full_clean(exclude=['user', 'table'], validate_unique=False)
+        self._save_checked(*args, **kwargs)
+        self._take_snapshot()
+    
+    def menu_items_total(self):
+        """Стоимость предзаказанных блюд (один агрегирующий запрос)"""
+        total = self.menu_items.aggregate(
+            total=Sum(F('price_per_item') * F('quantity'), output_field=models.DecimalField())
+        )['total']
+        return total or Decimal('0')
+    
+    @classmethod
+    def bump_version(cls, booking_id):
+        """Отметить изменение связанных записей бронирования (без загрузки строки)"""
+        cls.objects.filter(pk=booking_id).update(version=F('version') + 1)
+    
+    def recalculate_total(self):
+        """Пересчитать общую сумму после изменения предзаказа"""
+        self.total_amount = self.table_price + self.menu_items_total()
+        self.save(update_fields=['total_amount', 'updated_at'])
+    
+    def _save_checked(self, *args, **kwargs):
+        """
+        Сохранение с преобразованием нарушения ограничения пересечений в ValidationError.
         
-        # Пересчитываем общую сумму с учетом предзаказанных блюд
-        if self.pk:
-            menu_items_total = sum(item.total_price for item in self.menu_items.all())
-            if self.total_amount != self.table_price + menu_items_total:
-                self.total_amount = self.table_price + menu_items_total
-                super().save(update_fields=['total_amount'])
+        full_clean в save() не проверяет ограничение (поле table исключено),
+        поэтому пересечение, пропущенное проверкой сериализатора или занятое
+        параллельным запросом, отклоняет только БД.
+        """
+        try:
+            with transaction.atomic():
+                super().save(*args, **kwargs)
+        except IntegrityError as e:
+            if getattr(e.__cause__, 'pgcode', None) == errorcodes.EXCLUSION_VIOLATION:
+                raise ValidationError(BOOKING_OVERLAP_MESSAGE)
+            raise
     
     def generate_booking_number(self):
         """Генерация уникального номера бронирования"""
-        import random
-        import string
-        
-        while True:
-            number = ''.join(random.choices(string.digits, k=8))
-            if not Booking.objects.filter(booking_number=number).exists():
-                return number
+        from .numbering import booking_numbers
+        return booking_numbers.allocate()
     
     @property
     def can_be_cancelled(self):
@@ -178,9 +282,9 @@ class Booking(models.Model):
         if self.status in ['cancelled', 'completed', 'no_show']:
             return False
         
-        from apps.restaurant.models import RestaurantSettings
+        from apps.restaurant.settings_cache import get_restaurant_settings
         try:
-            settings = RestaurantSettings.objects.first()
+            settings = get_restaurant_settings()
             cancellation_hours = settings.cancellation_hours if settings else 2
         except:
             cancellation_hours = 2
@@ -266,7 +370,7 @@ class BookingMenuItem(models.Model):
         
         # Обновляем общую сумму бронирования
         if self.booking_id:
-            self.booking.save()
+            self.booking.recalculate_total()
 
 class BookingHistory(models.Model):
     """История изменений бронирования"""
@@ -283,10 +387,34 @@ class BookingHistory(models.Model):
         verbose_name = _('История бронирования')
         verbose_name_plural = _('История бронирований')
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='bookings_history_created_idx'),
+        ]
     
     def __str__(self):
         return f"История #{self.booking.booking_number} - {self.action}"
 
+class BookingDailyStats(models.Model):
+    """Ежедневная сводка бронирований по статусам и зонам"""
+    
+    date = models.DateField(_('Дата'))
+    status = models.CharField(_('Статус'), max_length=20, choices=Booking.STATUS_CHOICES)
+    zone = models.ForeignKey('restaurant.Zone', on_delete=models.CASCADE, related_name='booking_stats', verbose_name=_('Зона'))
+    bookings_count = models.IntegerField(_('Количество бронирований'), default=0)
+    guests_count = models.IntegerField(_('Количество гостей'), default=0)
+    revenue = models.DecimalField(_('Сумма'), max_digits=12, decimal_places=2, default=0)
+    pending_payments_count = models.IntegerField(_('Ожидают оплаты'), default=0)
+    deposit_paid_count = models.IntegerField(_('Депозит оплачен'), default=0)
+    
+    class Meta:
+        verbose_name = _('Сводка бронирований за день')
+        verbose_name_plural = _('Сводки бронирований по дням')
+        ordering = ['-date', 'status']
+        unique_together = ['date', 'status', 'zone']
+    
+    def __str__(self):
+        return f"{self.date} - {self.get_status_display()} - {self.zone_id}"
+
 class Payment(models.Model):
     """Платежи по бронированиям"""
     
@@ -325,6 +453,71 @@ class Payment(models.Model):
         verbose_name = _('Платеж')
         verbose_name_plural = _('Платежи')
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='bookings_payment_created_idx'),
+        ]
     
     def __str__(self):
         return f"Платеж {self.payment_id} - {self.amount} сум"
+
+class BookingReminder(models.Model):
+    """
+    Запланированное напоминание о бронировании.
+    
+    Строки создаются за offset_minutes до начала подтвержденного бронирования
+    (settings.BOOKING_REMINDER_OFFSETS) и перепланируются при переносе или
+    отмене; dispatch_booking_reminders отправляет наступившие по индексу due_at.
+    sent_at проставляется в момент, когда напоминание забрано на отправку.
+    """
+    
+    booking = models.ForeignKey(Booking, on_delete=models.CASCADE, related_name='reminders', verbose_name=_('Бронирование'))
+    offset_minutes = models.PositiveIntegerField(_('За сколько минут до начала'))
+    due_at = models.DateTimeField(_('Время отправки'))
+    sent_at = models.DateTimeField(_('Отправлено'), blank=True, null=True)
+    attempts = models.PositiveIntegerField(_('Неудачных попыток'), default=0)
+    last_error = models.TextField(_('Последняя ошибка'), blank=True)
+    
+    class Meta:
+        verbose_name = _('Напоминание о бронировании')
+        verbose_name_plural = _('Напоминания о бронированиях')
+        ordering = ['due_at']
+        unique_together = ['booking', 'offset_minutes']
+        indexes = [
+            models.Index(fields=['due_at', 'id'], name='bookings_reminder_due_idx', condition=Q(sent_at__isnull=True)),
+        ]
+    
+    def __str__(self):
+        return f"Напоминание #{self.booking_id} за {self.offset_minutes} мин"
+
+class NotificationOutbox(models.Model):
+    """
+    Очередь уведомлений (transactional outbox).
+    
+    Строка пишется в той же транзакции, что и изменение бронирования,
+    а в Celery ее передает flush_notification_outbox уже после коммита.
+    """
+    
+    task = models.CharField(_('Задача'), max_length=200)
+    args = models.JSONField(_('Аргументы'), default=list, blank=True)
+    booking = models.ForeignKey(Booking, on_delete=models.CASCADE, null=True, blank=True, related_name='notifications', verbose_name=_('Бронирование'))
+    # Ожидающие уведомления с одинаковым ключом схлопываются в последнее
+    coalesce_key = models.CharField(_('Ключ объединения'), max_length=200, blank=True)
+    coalesced_count = models.PositiveIntegerField(_('Объединено уведомлений'), default=0)
+    attempts = models.PositiveIntegerField(_('Попыток'), default=0)
+    last_error = models.TextField(_('Последняя ошибка'), blank=True)
+    available_at = models.DateTimeField(_('Доступно с'), default=timezone.now)
+    dispatched_at = models.DateTimeField(_('Передано'), blank=True, null=True)
+    created_at = models.DateTimeField(_('Создано'), auto_now_add=True)
+    
+    class Meta:
+        verbose_name = _('Уведомление в очереди')
+        verbose_name_plural = _('Очередь уведомлений')
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['available_at', 'id'], name='bookings_outbox_pending_idx', condition=Q(dispatched_at__isnull=True)),
+            models.Index(fields=['dispatched_at'], name='bookings_outbox_dispatched_idx'),
+            models.Index(fields=['coalesce_key'], name='bookings_outbox_coalesce_idx', condition=Q(dispatched_at__isnull=True)),
+        ]
+    
+    def __str__(self):
+        return f"{self.task}{tuple(self.args)}"
@@ -0,0 +1,98 @@
+import hashlib
+import hmac
+import os
+import threading
+from django.conf import settings
+from django.db import connections
+
+# Последовательность создается миграцией 0005 с шагом BLOCK_SIZE:
+# каждый nextval резервирует за процессом блок из BLOCK_SIZE номеров.
+# При изменении BLOCK_SIZE нужна миграция с ALTER SEQUENCE ... INCREMENT BY
+BOOKING_NUMBER_SEQUENCE = 'bookings_booking_number_seq'
+BLOCK_SIZE = 100
+
+# Алфавит Crockford base32 без похожих символов (I, L, O, U)
+ALPHABET = '0123456789ABCDEFGHJKMNPQRSTVWXYZ'
+# Первый символ всегда буква: коды не пересекаются со старыми числовыми номерами
+LEADING_ALPHABET = 'ABCDEFGHJKMNPQRSTVWXYZ'
+CODE_LENGTH = 8
+CODE_SPACE = len(LEADING_ALPHABET) * len(ALPHABET) ** (CODE_LENGTH - 1)
+
+_HALF_BITS = 20
+_HALF_MASK = (1 << _HALF_BITS) - 1
+_ROUNDS = 4
+
+def _round_function(round_index, value, key):
+    # Порядок полей в сообщении менять нельзя: от него зависят уже выданные номера
+    digest = hmac.new(key, b'%d:%d' % (value, round_index), hashlib.sha256).digest()
+    return int.from_bytes(digest[:4], 'big') & _HALF_MASK
+
+def _feistel(value, key):
+    """Биективная перестановка 40-битных чисел (сеть Фейстеля)"""
+    left, right = value >> _HALF_BITS, value & _HALF_MASK
+    for round_index in range(_ROUNDS):
+        left, right = right, left ^ _round_function(round_index, right, key)
+    return (left << _HALF_BITS) | right
+
+def _permute(value, key):
+    """Перестановка внутри CODE_SPACE (cycle walking поверх 40-битной сети)"""
+    value = _feistel(value, key)
+    while value >= CODE_SPACE:
+        value = _feistel(value, key)
+    return value
+
+def encode_booking_number(value, key=None):
+    """
+    Кодирование порядкового номера в непредсказуемый 8-символьный код.
+
+    Перестановка взаимно однозначна, поэтому разные значения
+    последовательности всегда дают разные коды.
+    """
+    if not 0 <= value < CODE_SPACE:
+        raise ValueError('Значение последовательности вне допустимого диапазона')
+    if key is None:
+        key = settings.BOOKING_NUMBER_KEY.encode()
+
+    permuted = _permute(value, key)
+    chars = []
+    for _ in range(CODE_LENGTH - 1):
+        permuted, index = divmod(permuted, len(ALPHABET))
+        chars.append(ALPHABET[index])
+    chars.append(LEADING_ALPHABET[permuted])
+    return ''.join(reversed(chars))
+
+class BookingNumberAllocator:
+    """
+    Выдача номеров бронирований без обращений к БД на каждый номер.
+
+    Процесс резервирует блок значений одним nextval и раздает его из памяти.
+    После fork (воркеры gunicorn/Celery) блок родителя не используется.
+    """
+
+    def __init__(self, sequence=BOOKING_NUMBER_SEQUENCE, block_size=BLOCK_SIZE, using='default'):
+        self.sequence = sequence
+        self.block_size = block_size
+        self.using = using
+        self._lock = threading.Lock()
+        self._next = 0
+        self._end = 0
+        self._pid = None
+
+    def _reserve_block(self):
+        with connections[self.using].cursor() as cursor:
+            cursor.execute('SELECT nextval(%s)', [self.sequence])
+            start = cursor.fetchone()[0]
+        self._next = start
+        self._end = start + self.block_size
+        self._pid = os.getpid()
+
+    def allocate(self):
+        """Следующий уникальный номер бронирования"""
+        with self._lock:
+            if self._pid != os.getpid() or self._next >= self._end:
+                self._reserve_block()
+            value = self._next
+            self._next += 1
+        return encode_booking_number(value)
+
+booking_numbers = BookingNumberAllocator()
@@ -0,0 +1,144 @@
+"""
+Transactional outbox для уведомлений о бронированиях.
+
+Вместо task.delay() на пути запроса уведомление записывается строкой
+NotificationOutbox в текущей транзакции: задача не уйдет в брокер, если
+транзакция откатится, и не выполнится раньше, чем изменения станут видны.
+flush_outbox пачками передает строки в Celery через одно соединение с
+брокером; при недоступности брокера строки остаются в таблице и
+передаются позже с растущей задержкой. Доставка - at-least-once.
+"""
+import logging
+from contextlib import nullcontext
+from datetime import timedelta
+from celery import current_app
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+from django.utils import timezone
+from .models import NotificationOutbox
+
+logger = logging.getLogger(__name__)
+
+MAX_RETRY_DELAY = 300
+
+def enqueue_notification(task, *args, booking=None, coalesce=False):
+    """
+    Поставить задачу в outbox (в рамках текущей транзакции).
+    
+    С coalesce=True уведомление задерживается на NOTIFICATION_COALESCE_WINDOW
+    секунд, а еще не переданные уведомления той же задачи по тому же
+    бронированию удаляются: гость получит только последнее состояние.
+    Число сэкономленных отправок копится в coalesced_count.
+    """
+    if not coalesce or booking is None:
+        return NotificationOutbox.objects.create(task=task.name, args=list(args), booking=booking)
+    
+    coalesce_key = f'{task.name}:{booking.pk}'
+    with transaction.atomic():
+        # Строки, которые сейчас передает флашер, пропускаются: они уже отправляются
+        superseded = list(
+            NotificationOutbox.objects
+            .filter(coalesce_key=coalesce_key, dispatched_at__isnull=True)
+            .select_for_update(skip_locked=True)
+            .values_list('pk', 'coalesced_count')
+        )
+        if superseded:
+            NotificationOutbox.objects.filter(pk__in=[pk for pk, _ in superseded]).delete()
+        return NotificationOutbox.objects.create(
+            task=task.name,
+            args=list(args),
+            booking=booking,
+            coalesce_key=coalesce_key,
+            coalesced_count=sum(count + 1 for _, count in superseded),
+            available_at=timezone.now() + timedelta(seconds=settings.NOTIFICATION_COALESCE_WINDOW),
+        )
+
+def _retry_delay(attempts):
+    return timedelta(seconds=min(2 ** attempts, MAX_RETRY_DELAY))
+
+def _dispatch(rows, now):
+    """
+    Передача строк в Celery; при ошибке брокера передача прерывается.
+
+    В прямом режиме задача выполняется на месте, и ее ошибка откладывает
+    только свою строку: остальные строки пачки выполняются дальше.
+    """
+    dispatched = []
+    direct = settings.NOTIFICATION_OUTBOX_DIRECT
+    # Все задачи пачки публикуются через одно соединение с брокером
+    with (nullcontext() if direct else current_app.producer_or_acquire()) as producer:
+        for row in rows:
+            task = current_app.tasks[row.task]
+            try:
+                if direct:
+                    # apply() по умолчанию сохраняет исключение в результате, не выбрасывая его
+                    task.apply(args=row.args, throw=True)
+                else:
+                    task.apply_async(args=row.args, producer=producer)
+            except Exception as e:
+                logger.exception('Не удалось передать уведомление %s', row.pk)
+                row.attempts += 1
+                row.last_error = str(e)
+                row.available_at = now + _retry_delay(row.attempts)
+                row.save(update_fields=['attempts', 'last_error', 'available_at'])
+                if direct:
+                    continue
+                break
+            dispatched.append(row.pk)
+    return dispatched
+
+def flush_outbox(batch_size=None, max_batches=None):
+    """
+    Передать накопившиеся уведомления пачками по batch_size.
+
+    Строки пачки блокируются через SELECT ... FOR UPDATE SKIP LOCKED,
+    поэтому несколько флашеров не передают одно уведомление дважды.
+    Возвращает число переданных уведомлений.
+    """
+    batch_size = batch_size or settings.NOTIFICATION_OUTBOX_BATCH_SIZE
+    total = 0
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        now = timezone.now()
+        with transaction.atomic():
+            rows = list(
+                NotificationOutbox.objects
+                .filter(dispatched_at__isnull=True, available_at__lte=now)
+                .order_by('available_at', 'id')
+                .select_for_update(skip_locked=True)[:batch_size]
+            )
+            if not rows:
+                break
+            dispatched = _dispatch(rows, now)
+            NotificationOutbox.objects.filter(pk__in=dispatched).update(dispatched_at=now)
+        total += len(dispatched)
+        batches += 1
+        if len(dispatched) < len(rows) or len(rows) < batch_size:
+            # Брокер недоступен или очередь разобрана - остальное в следующий запуск
+            break
+    return total
+
+def purge_outbox(days=None):
+    """Удалить переданные уведомления старше NOTIFICATION_OUTBOX_RETENTION_DAYS"""
+    days = settings.NOTIFICATION_OUTBOX_RETENTION_DAYS if days is None else days
+    deleted, _ = NotificationOutbox.objects.filter(
+        dispatched_at__lt=timezone.now() - timedelta(days=days)
+    ).delete()
+    return deleted
+
+def outbox_metrics():
+    """Счетчики outbox за срок хранения переданных строк (один запрос)"""
+    metrics = NotificationOutbox.objects.aggregate(
+        pending=Count('id', filter=Q(dispatched_at__isnull=True)),
+        retrying=Count('id', filter=Q(dispatched_at__isnull=True, attempts__gt=0)),
+        dispatched=Count('id', filter=Q(dispatched_at__isnull=False)),
+        coalesced=Sum('coalesced_count'),
+    )
+    metrics['coalesced'] = metrics['coalesced'] or 0
+    # Доля отправок, от которых избавило объединение
+    enqueued = metrics['pending'] + metrics['dispatched'] + metrics['coalesced']
+    metrics['coalesced_ratio'] = round(metrics['coalesced'] / enqueued, 3) if enqueued else 0
+    metrics['coalesce_window'] = settings.NOTIFICATION_COALESCE_WINDOW
+    metrics['retention_days'] = settings.NOTIFICATION_OUTBOX_RETENTION_DAYS
+    return metrics
@@ -0,0 +1,11 @@
+from apps.core.pagination import KeysetCursorPagination
+
+class BookingCursorPagination(KeysetCursorPagination):
+    """Постраничный вывод бронирований по (start_time, id)"""
+    
+    ordering = ('-start_time', '-id')
+
+class CreatedAtCursorPagination(KeysetCursorPagination):
+    """Постраничный вывод записей по дате создания (история, платежи)"""
+    
+    ordering = ('-created_at', '-id')
@@ -0,0 +1,219 @@
+"""
+Планирование и отправка напоминаний о бронированиях.
+
+Для подтвержденного бронирования создается по строке BookingReminder на
+каждый отступ из BOOKING_REMINDER_OFFSETS (минуты до start_time). При
+переносе или смене статуса неотправленные строки перестраиваются.
+claim_due_reminders забирает наступившие напоминания небольшими пачками
+по индексу (due_at, id), поэтому нагрузка на почту и SMS-провайдера
+распределяется по дню, а не приходится на одну ежедневную рассылку.
+Пачки отправляются уже после фиксации транзакции (send_reminders).
+"""
+import logging
+from datetime import timedelta
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from .mailer import send_reminder_chunk
+from .models import BookingReminder
+from .sms import get_sms_gateway
+
+logger = logging.getLogger(__name__)
+
+# Статус, в котором бронированию нужны напоминания
+REMINDER_STATUS = 'confirmed'
+
+def reminder_due_times(start_time, now=None):
+    """{отступ в минутах: время отправки} для еще не наступивших напоминаний"""
+    now = now or timezone.now()
+    due_times = {}
+    for offset in settings.BOOKING_REMINDER_OFFSETS:
+        due_at = start_time - timedelta(minutes=offset)
+        if due_at > now:
+            due_times[offset] = due_at
+    return due_times
+
+def plan_reminders(booking):
+    """
+    Перепланировать напоминания бронирования.
+
+    Неотправленные напоминания удаляются; для подтвержденного бронирования
+    создаются новые. Уже отправленное напоминание того же отступа
+    сбрасывается, чтобы после переноса клиент получил новое время.
+    """
+    BookingReminder.objects.filter(booking=booking, sent_at__isnull=True).delete()
+    if booking.status != REMINDER_STATUS:
+        return 0
+
+    reminders = [
+        BookingReminder(booking=booking, offset_minutes=offset, due_at=due_at)
+        for offset, due_at in reminder_due_times(booking.start_time).items()
+    ]
+    BookingReminder.objects.bulk_create(
+        reminders,
+        update_conflicts=True,
+        unique_fields=['booking', 'offset_minutes'],
+        update_fields=['due_at', 'sent_at'],
+    )
+    return len(reminders)
+
+def is_superseded(reminder, now):
+    """
+    Напоминание устарело: бронирование уже началось или наступило
+    более позднее напоминание (например, после простоя воркеров)
+    """
+    start_time = reminder.booking.start_time
+    if start_time <= now:
+        return True
+    return any(
+        start_time - timedelta(minutes=offset) <= now
+        for offset in settings.BOOKING_REMINDER_OFFSETS
+        if offset < reminder.offset_minutes
+    )
+
+def reminder_sms_text(booking):
+    local_start = timezone.localtime(booking.start_time)
+    return f"Напоминание: {local_start.strftime('%d.%m в %H:%M')} у вас бронирование. Бронь #{booking.booking_number}"
+
+REMINDER_MAX_ATTEMPTS = 3
+MAX_RETRY_DELAY = 30 * 60
+
+def _retry_delay(attempts):
+    return timedelta(seconds=min(60 * 2 ** attempts, MAX_RETRY_DELAY))
+
+def _send(bookings):
+    """
+    Email и SMS по порции бронирований с учетом настроек пользователя.
+
+    Возвращает счетчики, {id бронирования: текст ошибки} для бронирований,
+    по которым не ушло хотя бы одно сообщение, и множество бронирований,
+    по которым не ушло ни одно.
+    """
+    email_bookings = [booking for booking in bookings if booking.user.email_notifications]
+    sms_bookings = {
+        (booking.contact_phone, reminder_sms_text(booking)): booking.pk
+        for booking in bookings
+        if booking.user.sms_notifications and booking.contact_phone
+    }
+    report = send_reminder_chunk(email_bookings) if email_bookings else {'sent': 0, 'failed': []}
+    sms_sent, sms_failed = get_sms_gateway().send_many(list(sms_bookings)) if sms_bookings else (0, [])
+
+    email_failed = set(report['failed'])
+    sms_ids = set(sms_bookings.values())
+    sms_failed_ids = {sms_bookings[message] for message in sms_failed}
+    errors = {}
+    undelivered = set()
+    for booking in bookings:
+        channels = {}
+        if booking.user.email_notifications and booking.contact_email:
+            channels['email'] = booking.pk in email_failed
+        if booking.pk in sms_ids:
+            channels['SMS'] = booking.pk in sms_failed_ids
+        failed = [channel for channel, is_failed in channels.items() if is_failed]
+        if failed:
+            errors[booking.pk] = 'Не отправлено: {}'.format(', '.join(failed))
+            if len(failed) == len(channels):
+                undelivered.add(booking.pk)
+    counters = {
+        'emails': report['sent'],
+        'email_errors': len(report['failed']),
+        'sms': sms_sent,
+        'sms_errors': len(sms_failed),
+    }
+    return counters, errors, undelivered
+
+def claim_due_reminders(batch_size=None, now=None):
+    """
+    Забрать наступившие напоминания пачками по batch_size.
+
+    Каждая пачка блокируется через FOR UPDATE SKIP LOCKED и помечается
+    отправленной в отдельной короткой транзакции, которая фиксируется до
+    отправки: блокировки не держатся, пока работают SMTP и SMS-провайдер.
+    Напоминание, забранное упавшим воркером, не отправляется повторно.
+    Возвращает список пачек id напоминаний.
+    """
+    batch_size = batch_size or settings.MAIL_BATCH_SIZE
+    batches = []
+    while True:
+        claimed_at = now or timezone.now()
+        with transaction.atomic():
+            reminder_ids = list(
+                BookingReminder.objects
+                .filter(sent_at__isnull=True, due_at__lte=claimed_at)
+                .order_by('due_at', 'id')
+                .select_for_update(skip_locked=True)
+                .values_list('id', flat=True)[:batch_size]
+            )
+            BookingReminder.objects.filter(pk__in=reminder_ids).update(sent_at=claimed_at)
+        if reminder_ids:
+            batches.append(reminder_ids)
+        if len(reminder_ids) < batch_size:
+            return batches
+
+def _record_failures(reminders, errors, undelivered, now):
+    """
+    Сохранить ошибки отправки.
+
+    Напоминание, по которому гостю не ушло ни одно сообщение, возвращается
+    в очередь с растущей задержкой (не более REMINDER_MAX_ATTEMPTS попыток).
+    Возвращает число напоминаний, возвращенных в очередь.
+    """
+    failed = []
+    retries = 0
+    for reminder in reminders:
+        if reminder.booking_id not in errors:
+            continue
+        reminder.attempts += 1
+        reminder.last_error = errors[reminder.booking_id]
+        if reminder.booking_id in undelivered and reminder.attempts < REMINDER_MAX_ATTEMPTS:
+            reminder.sent_at = None
+            reminder.due_at = now + _retry_delay(reminder.attempts)
+            retries += 1
+        failed.append(reminder)
+    if failed:
+        BookingReminder.objects.bulk_update(failed, ['attempts', 'last_error', 'sent_at', 'due_at'])
+    return retries
+
+def send_reminders(reminder_ids, now=None):
+    """
+    Отправить забранные напоминания (вне транзакции).
+
+    Напоминания бронирований, которые к этому моменту уже не подтверждены,
+    и устаревшие напоминания пропускаются.
+    """
+    now = now or timezone.now()
+    reminders = list(
+        BookingReminder.objects
+        .filter(pk__in=reminder_ids)
+        .select_related('booking__user', 'booking__table__zone')
+        .order_by('due_at', 'id')
+    )
+    # Одно бронирование могло накопить несколько наступивших напоминаний
+    bookings = {
+        reminder.booking_id: reminder.booking
+        for reminder in reminders
+        if reminder.booking.status == REMINDER_STATUS and reminder.booking.email_confirmed
+        and not is_superseded(reminder, now)
+    }
+    counters, errors, undelivered = _send(list(bookings.values()))
+    counters['reminders'] = len(reminders)
+    counters['retries'] = _record_failures(reminders, errors, undelivered, now)
+    return counters
+
+def merge_reports(reports):
+    """Сумма счетчиков нескольких пачек"""
+    totals = {'reminders': 0, 'emails': 0, 'email_errors': 0, 'sms': 0, 'sms_errors': 0, 'retries': 0}
+    for report in reports:
+        for key in totals:
+            totals[key] += report.get(key, 0)
+    return totals
+
+def dispatch_due_reminders(batch_size=None, now=None):
+    """Забрать и отправить наступившие напоминания в текущем процессе"""
+    totals = merge_reports(
+        send_reminders(reminder_ids, now=now)
+        for reminder_ids in claim_due_reminders(batch_size, now=now)
+    )
+    if totals['reminders']:
+        logger.info('Напоминания: %s', totals)
+    return totals
@@ -1,10 +1,19 @@
 from rest_framework import serializers
+from django.db import models, transaction
 from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError as DjangoValidationError
 from django.utils import timezone
 from datetime import timedelta
+from .availability import DayAvailability
+from .export import EXPORT_FORMATS
 from .models import Booking, BookingMenuItem, BookingHistory, Payment
-from apps.restaurant.models import Table, MenuItem, RestaurantSettings
+from .outbox import enqueue_notification
+from .services import create_booking
+from apps.restaurant.models import Table, MenuItem
+from apps.restaurant.settings_cache import get_restaurant_settings
+from apps.core.serializers import SparseFieldsMixin
 from apps.restaurant.serializers import TableSerializer, MenuItemSerializer
+from apps.restaurant.table_status import resolve_table_statuses
 
 User = get_user_model()
 
@@ -24,16 +33,26 @@ class BookingHistorySerializer(serializers.ModelSerializer):
     
     class Meta:
         model = BookingHistory
-        fields = ['id', 'action', 'old_status', 'new_status', 'changed_by_name', 'comment', 'created_at']
+        fields = ['id', 'booking', 'action', 'old_status', 'new_status', 'changed_by_name', 'comment', 'created_at']
 
 class PaymentSerializer(serializers.ModelSerializer):
     """Сериализатор для платежей"""
     
     class Meta:
         model = Payment
-        fields = ['id', 'payment_id', 'amount', 'method', 'status', 'created_at', 'completed_at']
+        fields = ['id', 'booking', 'payment_id', 'amount', 'method', 'status', 'created_at', 'completed_at']
 
-class BookingSerializer(serializers.ModelSerializer):
+class BookingListSerializer(serializers.ListSerializer):
+    """Список бронирований: статусы столиков вычисляются одним запросом"""
+    
+    def to_representation(self, data):
+        bookings = list(data.all() if isinstance(data, models.Manager) else data)
+        table_details = self.child.fields.get('table_details')
+        if table_details is not None and 'current_status' in table_details.fields:
+            resolve_table_statuses(booking.table for booking in bookings)
+        return super().to_representation(bookings)
+
+class BookingSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Сериализатор для бронирований"""
     table_details = TableSerializer(source='table', read_only=True)
     menu_items = BookingMenuItemSerializer(many=True, read_only=True)
@@ -52,6 +71,8 @@ class BookingSerializer(serializers.ModelSerializer):
             'remaining_amount', 'email_confirmed', 'created_at', 'updated_at', 'menu_items', 'payments',
             'can_be_cancelled', 'is_active'
         ]
+        list_serializer_class = BookingListSerializer
+        expandable_fields = ['table_details', 'menu_items', 'payments', 'can_be_cancelled']
         read_only_fields = [
             'id', 'booking_number', 'user', 'duration', 'table_price', 'deposit_amount', 'total_amount',
             'remaining_amount', 'email_confirmed', 'created_at', 'updated_at'
@@ -92,10 +113,11 @@ class BookingCreateSerializer(serializers.ModelSerializer):
             duration = int((end_time - start_time).total_seconds() / 60)
             
             try:
-                settings = RestaurantSettings.objects.first()
+                settings = get_restaurant_settings()
                 min_duration = settings.min_booking_duration if settings else 60
                 max_duration = settings.max_booking_duration if settings else 240
             except:
+                settings = None
                 min_duration = 60
                 max_duration = 240
             
@@ -117,16 +139,21 @@ class BookingCreateSerializer(serializers.ModelSerializer):
                     f'Количество гостей ({guests_count}) меньше минимальной вместимости столика ({table.min_capacity})'
                 )
         
-        # Проверяем доступность столика
+        # Проверяем рабочее время и пересечение с другими бронированиями по той же
+        # сетке занятости, по которой строятся свободные слоты
         if table and start_time and end_time:
-            overlapping_bookings = Booking.objects.filter(
-                table=table,
-                status__in=['confirmed', 'active', 'pending'],
-                start_time__lt=end_time,
-                end_time__gt=start_time
-            )
+            availability = DayAvailability.from_settings(timezone.localtime(start_time).date(), settings)
+            
+            if not availability.within_hours(start_time, end_time):
+                raise serializers.ValidationError(
+                    'Бронирование возможно только с {} до {}'.format(
+                        timezone.localtime(availability.day_start).strftime('%H:%M'),
+                        timezone.localtime(availability.day_end).strftime('%H:%M'),
+                    )
+                )
             
-            if overlapping_bookings.exists():
+            availability.load_bookings([table.id], exclude_pk=self.instance.pk if self.instance else None)
+            if not availability.is_free(table.id, start_time, end_time):
                 raise serializers.ValidationError('Столик уже забронирован на это время')
         
         return data
@@ -135,40 +162,32 @@ class BookingCreateSerializer(serializers.ModelSerializer):
         """Создание бронирования"""
         selected_menu_items = validated_data.pop('selected_menu_items', [])
         
-        # Устанавливаем пользователя
-        validated_data['user'] = self.context['request'].user
-        
-        # Создаем бронирование
-        booking = Booking.objects.create(**validated_data)
-        
-        # Добавляем предзаказанные блюда
-        for item_data in selected_menu_items:
-            BookingMenuItem.objects.create(
-                booking=booking,
-                menu_item_id=item_data['menu_item_id'],
-                quantity=item_data['quantity'],
-                notes=item_data.get('notes', '')
-            )
-        
-        # Отправляем email подтверждение
+        # Создаем бронирование вместе с предзаказом (пересечение, найденное БД
+        # при гонке запросов, возвращается клиенту как обычная ошибка валидации)
         from .tasks import send_booking_confirmation_email
-        send_booking_confirmation_email.delay(booking.id)
+        
+        try:
+            with transaction.atomic():
+                booking = create_booking(self.context['request'].user, selected_menu_items, **validated_data)
+                # Email подтверждение уходит в outbox в той же транзакции
+                enqueue_notification(send_booking_confirmation_email, booking.id, booking=booking)
+        except DjangoValidationError as e:
+            raise serializers.ValidationError(e.messages)
         
         return booking
 
-class AvailableTimeSlotsSerializer(serializers.Serializer):
-    """Сериализатор для доступных временных слотов"""
+class BookingDateSerializer(serializers.Serializer):
+    """Базовый сериализатор для поиска свободного времени на дату"""
     
     date = serializers.DateField()
-    table_id = serializers.IntegerField()
-    duration = serializers.IntegerField(required=False, default=120)
+    duration = serializers.IntegerField(required=False, default=120, min_value=1)
     
     def validate_date(self, value):
         if value < timezone.now().date():
             raise serializers.ValidationError('Нельзя выбрать дату в прошлом')
         
         try:
-            settings = RestaurantSettings.objects.first()
+            settings = get_restaurant_settings()
             advance_days = settings.booking_advance_days if settings else 30
         except:
             advance_days = 30
@@ -178,6 +197,11 @@ class AvailableTimeSlotsSerializer(serializers.Serializer):
             raise serializers.ValidationError(f'Можно бронировать максимум на {advance_days} дней вперед')
         
         return value
+
+class AvailableTimeSlotsSerializer(BookingDateSerializer):
+    """Сериализатор для доступных временных слотов"""
+    
+    table_id = serializers.IntegerField()
     
     def validate_table_id(self, value):
         try:
@@ -186,6 +210,39 @@ class AvailableTimeSlotsSerializer(serializers.Serializer):
         except Table.DoesNotExist:
             raise serializers.ValidationError('Столик не найден или неактивен')
 
+class TableAvailabilitySearchSerializer(BookingDateSerializer):
+    """Сериализатор для поиска свободных столиков по количеству гостей"""
+    
+    guests_count = serializers.IntegerField(min_value=1)
+    zone = serializers.IntegerField(required=False)
+    is_vip = serializers.BooleanField(required=False, allow_null=True, default=None)
+
+class NextAvailableSearchSerializer(BookingDateSerializer):
+    """Сериализатор для поиска ближайших свободных вариантов"""
+    
+    date = serializers.DateField(required=False)
+    guests_count = serializers.IntegerField(min_value=1)
+    zone = serializers.IntegerField(required=False)
+    is_vip = serializers.BooleanField(required=False, allow_null=True, default=None)
+    limit = serializers.IntegerField(required=False, default=5, min_value=1, max_value=50)
+
+class BookingExportQuerySerializer(serializers.Serializer):
+    """Параметры выгрузки для бухгалтерии"""
+    
+    MAX_RANGE_DAYS = 366
+    
+    date_from = serializers.DateField()
+    date_to = serializers.DateField()
+    # Не format: этот параметр DRF использует для выбора рендерера
+    output = serializers.ChoiceField(choices=list(EXPORT_FORMATS), default='csv')
+    
+    def validate(self, attrs):
+        if attrs['date_from'] > attrs['date_to']:
+            raise serializers.ValidationError('Начальная дата позже конечной')
+        if (attrs['date_to'] - attrs['date_from']).days >= self.MAX_RANGE_DAYS:
+            raise serializers.ValidationError(f'Период выгрузки не может превышать {self.MAX_RANGE_DAYS} дней')
+        return attrs
+
 class EmailConfirmationSerializer(serializers.Serializer):
     """Сериализатор для подтверждения email"""
     token = serializers.UUIDField()
@@ -0,0 +1,62 @@
+from decimal import Decimal
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from apps.restaurant.models import MenuItem
+from .models import Booking, BookingMenuItem
+
+
+def _collect_menu_items(selected_menu_items):
+    """Сведение выбранных блюд к {menu_item_id: (количество, примечание)}"""
+    items = {}
+    for item_data in selected_menu_items:
+        try:
+            menu_item_id = int(item_data['menu_item_id'])
+            quantity = int(item_data.get('quantity', 1))
+        except (KeyError, TypeError, ValueError):
+            raise ValidationError('Некорректные данные предзаказа')
+
+        if quantity < 1:
+            raise ValidationError('Количество блюд должно быть больше нуля')
+
+        # Повторно выбранное блюдо объединяем в одну позицию
+        previous_quantity, previous_notes = items.get(menu_item_id, (0, ''))
+        items[menu_item_id] = (previous_quantity + quantity, item_data.get('notes', '') or previous_notes)
+    return items
+
+def create_booking(user, selected_menu_items=(), **booking_data):
+    """
+    Создание бронирования с предзаказом в одной транзакции.
+
+    Цены блюд загружаются одним запросом, позиции предзаказа вставляются
+    одним bulk_create, а общая сумма считается один раз до вставки
+    бронирования, поэтому число запросов не зависит от количества блюд.
+    """
+    items = _collect_menu_items(selected_menu_items)
+
+    with transaction.atomic():
+        menu_items = MenuItem.objects.in_bulk(list(items))
+        missing = set(items) - set(menu_items)
+        if missing:
+            raise ValidationError('Блюда не найдены: {}'.format(', '.join(str(pk) for pk in sorted(missing))))
+
+        booking = Booking(user=user, **booking_data)
+        booking.populate_defaults()
+
+        booking_items = [
+            BookingMenuItem(
+                menu_item=menu_items[menu_item_id],
+                quantity=quantity,
+                price_per_item=menu_items[menu_item_id].price,
+                notes=notes
+            )
+            for menu_item_id, (quantity, notes) in items.items()
+        ]
+        menu_items_total = sum((item.total_price for item in booking_items), Decimal('0'))
+        booking.total_amount = booking.table_price + menu_items_total
+        booking.save()
+
+        for item in booking_items:
+            item.booking = booking
+        BookingMenuItem.objects.bulk_create(booking_items)
+
+    return booking
@@ -1,24 +1,29 @@
-from django.db.models.signals import post_save, pre_save
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
-from .models import Booking, BookingHistory
+from .models import Booking, BookingHistory, BookingMenuItem, Payment
+from . import stats
+from .reminders import plan_reminders
 
-@receiver(pre_save, sender=Booking)
-def track_booking_changes(sender, instance, **kwargs):
-    """Отслеживание изменений статуса бронирования"""
-    if instance.pk:
-        try:
-            old_instance = Booking.objects.get(pk=instance.pk)
-            if old_instance.status != instance.status:
-                # Создаем запись в истории
-                BookingHistory.objects.create(
-                    booking=instance,
-                    action='status_change',
-                    old_status=old_instance.status,
-                    new_status=instance.status,
-                    comment=f'Статус изменен с "{old_instance.get_status_display()}" на "{instance.get_status_display()}"'
-                )
-        except Booking.DoesNotExist:
-            pass
+@receiver(post_save, sender=Booking)
+def track_booking_changes(sender, instance, created, update_fields=None, **kwargs):
+    """Отслеживание изменений статуса бронирования по снимку загруженных значений"""
+    if created:
+        return
+    
+    if update_fields is not None and 'status' not in update_fields:
+        return
+    
+    if instance.has_changed('status'):
+        old_status = instance.get_loaded_value('status')
+        old_status_display = dict(Booking.STATUS_CHOICES).get(old_status, old_status)
+        # Создаем запись в истории
+        BookingHistory.objects.create(
+            booking=instance,
+            action='status_change',
+            old_status=old_status,
+            new_status=instance.status,
+            comment=f'Статус изменен с "{old_status_display}" на "{instance.get_status_display()}"'
+        )
 
 @receiver(post_save, sender=Booking)
 def booking_created(sender, instance, created, **kwargs):
@@ -29,4 +34,29 @@ def booking_created(sender, instance, created, **kwargs):
             action='created',
             new_status=instance.status,
             comment='Бронирование создано'
-        )
\ No newline at end of file
+        )
+
+@receiver(post_save, sender=Booking)
+def update_daily_stats(sender, instance, created, update_fields=None, **kwargs):
+    """Инкрементальное обновление дневной сводки бронирований"""
+    stats.record_booking_saved(instance, created, update_fields)
+
+@receiver(post_delete, sender=Booking)
+def remove_from_daily_stats(sender, instance, **kwargs):
+    """Исключение удаленного бронирования из дневной сводки"""
+    stats.record_booking_deleted(instance)
+
+@receiver(post_save, sender=Booking)
+def replan_reminders(sender, instance, created, update_fields=None, **kwargs):
+    """Перепланирование напоминаний при подтверждении, переносе или отмене"""
+    if update_fields is not None and not {'status', 'start_time'} & set(update_fields):
+        return
+    
+    if created or instance.has_changed('status') or instance.has_changed('start_time'):
+        plan_reminders(instance)
+
+@receiver([post_save, post_delete], sender=BookingMenuItem)
+@receiver([post_save, post_delete], sender=Payment)
+def bump_booking_version(sender, instance, **kwargs):
+    """Изменение предзаказа или платежей меняет ETag деталей бронирования"""
+    Booking.bump_version(instance.booking_id)
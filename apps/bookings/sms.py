@@ -0,0 +1,258 @@
+"""
+Шлюз отправки SMS.
+
+Провайдер выбирается настройкой SMS_BACKEND. Eskiz работает через общую
+HTTP-сессию с пулом соединений и таймаутами, а сообщения отправляются
+пачками через send-batch. Частота отправки ограничивается token bucket
+под квоту провайдера (SMS_RATE_LIMIT сообщений в секунду): состояние
+bucket хранится в общем кэше, поэтому квота делится между всеми воркерами.
+Для тестов есть LocmemSMSProvider, который складывает сообщения в outbox.
+"""
+import logging
+import os
+import re
+import threading
+import time
+import uuid
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+SMS_PREFIX = 'Restaurant Logan: '
+
+class SMSError(Exception):
+    """Провайдер не принял сообщения"""
+
+class TokenBucket:
+    """
+    Ограничитель частоты: rate токенов в секунду, не более capacity подряд.
+
+    acquire блокирует поток, пока не накопится нужное число токенов.
+    Состояние хранится в памяти процесса.
+    """
+
+    def __init__(self, rate, capacity=None):
+        self.rate = float(rate)
+        self.capacity = max(1, int(capacity or rate))
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def _take(self, tokens):
+        """Списать токены; возвращает время ожидания в секундах (0 - токены списаны)"""
+        with self._lock:
+            self._refill()
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return 0
+            return (tokens - self._tokens) / self.rate
+
+    def acquire(self, tokens=1):
+        if tokens > self.capacity:
+            raise ValueError('Запрошено больше токенов, чем вмещает bucket')
+        while True:
+            wait = self._take(tokens)
+            if not wait:
+                return
+            time.sleep(wait)
+
+class CacheTokenBucket(TokenBucket):
+    """
+    Token bucket, общий для всех процессов.
+
+    Состояние (токены, время обновления) хранится в кэше Django (Redis) и
+    изменяется под короткой блокировкой cache.add, поэтому rate действует
+    на все воркеры вместе, а не на каждый. Если кэш недоступен, bucket
+    работает в памяти процесса.
+    """
+
+    lock_timeout = 5
+    lock_poll_interval = 0.01
+
+    def __init__(self, rate, capacity=None, key='sms:token-bucket'):
+        super().__init__(rate, capacity)
+        self.key = key
+        self.lock_key = f'{key}:lock'
+        # Через это время простоя bucket снова полон, и состояние можно не хранить
+        self.state_timeout = int(self.capacity / self.rate) + 1
+
+    def _take_shared(self, tokens):
+        while not cache.add(self.lock_key, 1, timeout=self.lock_timeout):
+            time.sleep(self.lock_poll_interval)
+        try:
+            now = time.time()
+            available, updated = cache.get(self.key) or (self.capacity, now)
+            available = min(self.capacity, available + max(0.0, now - updated) * self.rate)
+            wait = 0
+            if available >= tokens:
+                available -= tokens
+            else:
+                wait = (tokens - available) / self.rate
+            cache.set(self.key, (available, now), timeout=self.state_timeout)
+            return wait
+        finally:
+            cache.delete(self.lock_key)
+
+    def _take(self, tokens):
+        try:
+            return self._take_shared(tokens)
+        except Exception:
+            logger.warning('Общий кэш недоступен, квота SMS считается в памяти процесса', exc_info=True)
+            return super()._take(tokens)
+
+def normalize_phone(phone_number):
+    """Номер только из цифр, как его ожидает провайдер (998XXXXXXXXX)"""
+    return re.sub(r'\D', '', phone_number or '')
+
+class BaseSMSProvider:
+    """Базовый провайдер: пачка отправляется по одному сообщению"""
+
+    max_batch_size = 1
+
+    def send_batch(self, messages):
+        """Отправка списка пар (телефон, текст), возвращает число принятых сообщений"""
+        for phone_number, text in messages:
+            self.send(phone_number, text)
+        return len(messages)
+
+    def send(self, phone_number, text):
+        raise NotImplementedError
+
+class EskizSMSProvider(BaseSMSProvider):
+    """Eskiz.uz: пакетная отправка через одну HTTP-сессию с пулом соединений"""
+
+    API_URL = 'https://notify.eskiz.uz/api/message/sms/'
+
+    def __init__(self):
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+
+        self.max_batch_size = settings.SMS_BATCH_SIZE
+        self.timeout = (settings.SMS_CONNECT_TIMEOUT, settings.SMS_READ_TIMEOUT)
+        self.session = requests.Session()
+        self.session.headers.update({
+            'Authorization': f'Bearer {settings.SMS_API_TOKEN}',
+            'Content-Type': 'application/json',
+        })
+        # Повторяем только то, что провайдер точно не обработал:
+        # ошибки соединения и ответы 429/503. Повтор после таймаута чтения
+        # мог бы продублировать SMS
+        retry = Retry(
+            total=3, connect=3, read=0, status=3,
+            status_forcelist=[429, 503], allowed_methods=['POST'],
+            backoff_factor=0.5, respect_retry_after_header=True, raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=settings.SMS_POOL_SIZE, max_retries=retry)
+        self.session.mount(self.API_URL, adapter)
+
+    def _post(self, endpoint, payload):
+        import requests
+
+        try:
+            response = self.session.post(self.API_URL + endpoint, json=payload, timeout=self.timeout)
+        except requests.RequestException as e:
+            raise SMSError(str(e)) from e
+        if response.status_code != 200:
+            raise SMSError(f'{response.status_code}: {response.text[:200]}')
+        return response
+
+    def send(self, phone_number, text):
+        self._post('send', {
+            'mobile_phone': normalize_phone(phone_number),
+            'message': text,
+            'from': settings.SMS_SENDER,
+        })
+
+    def send_batch(self, messages):
+        if len(messages) == 1:
+            self.send(*messages[0])
+            return 1
+        self._post('send-batch', {
+            'messages': [
+                {'user_sms_id': uuid.uuid4().hex, 'to': normalize_phone(phone_number), 'text': text}
+                for phone_number, text in messages
+            ],
+            'from': settings.SMS_SENDER,
+            'dispatch_id': int(time.time() * 1000),
+        })
+        return len(messages)
+
+# Сообщения, "отправленные" через LocmemSMSProvider
+outbox = []
+
+class LocmemSMSProvider(BaseSMSProvider):
+    """Заглушка для тестов и разработки: сообщения сохраняются в sms.outbox"""
+
+    max_batch_size = 100
+
+    def __init__(self):
+        self.batches = 0
+
+    def send(self, phone_number, text):
+        outbox.append((normalize_phone(phone_number), text))
+
+    def send_batch(self, messages):
+        self.batches += 1
+        return super().send_batch(messages)
+
+class SMSGateway:
+    """Провайдер процесса и ограничитель частоты, общий для всех процессов"""
+
+    def __init__(self, provider, bucket):
+        self.provider = provider
+        self.bucket = bucket
+
+    def send_many(self, messages):
+        """
+        Отправка списка пар (телефон, текст) пачками провайдера.
+
+        Возвращает (число отправленных, список неотправленных пар):
+        ошибка одной пачки не мешает отправке остальных.
+        """
+        messages = [(phone_number, text) for phone_number, text in messages if phone_number]
+        batch_size = max(1, min(self.provider.max_batch_size, self.bucket.capacity))
+        sent = 0
+        failed = []
+        for start in range(0, len(messages), batch_size):
+            batch = messages[start:start + batch_size]
+            self.bucket.acquire(len(batch))
+            try:
+                sent += self.provider.send_batch([(phone_number, SMS_PREFIX + text) for phone_number, text in batch])
+            except SMSError:
+                logger.exception('Не удалось отправить пачку SMS из %s сообщений', len(batch))
+                failed.extend(batch)
+        return sent, failed
+
+    def send(self, phone_number, text):
+        sent, failed = self.send_many([(phone_number, text)])
+        if failed:
+            raise SMSError(f'SMS на номер {phone_number} не отправлено')
+        return sent
+
+_gateway = None
+_gateway_pid = None
+_gateway_lock = threading.Lock()
+
+def get_sms_gateway():
+    """Шлюз текущего процесса (после fork воркера создается заново)"""
+    global _gateway, _gateway_pid
+    with _gateway_lock:
+        if _gateway is None or _gateway_pid != os.getpid():
+            provider = import_string(settings.SMS_BACKEND)()
+            _gateway = SMSGateway(provider, CacheTokenBucket(settings.SMS_RATE_LIMIT, settings.SMS_RATE_BURST))
+            _gateway_pid = os.getpid()
+        return _gateway
+
+def reset_sms_gateway():
+    """Сбросить шлюз (например, после изменения настроек SMS_*)"""
+    global _gateway
+    with _gateway_lock:
+        _gateway = None
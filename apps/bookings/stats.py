@@ -0,0 +1,136 @@
+from decimal import Decimal
+from django.core.exceptions import ObjectDoesNotExist
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+# Поля бронирования, от которых зависит сводка
+STATS_FIELDS = ['status', 'payment_status', 'table_id', 'date', 'guests_count', 'total_amount']
+
+def _contribution(values, zone_id):
+    """Ключ строки сводки и вклад одного бронирования в ее счетчики"""
+    key = (values['date'], values['status'], zone_id)
+    counters = {
+        'bookings_count': 1,
+        'guests_count': values['guests_count'] or 0,
+        'revenue': values['total_amount'] or Decimal('0'),
+        'pending_payments_count': int(values['payment_status'] == 'pending'),
+        'deposit_paid_count': int(values['payment_status'] == 'deposit_paid'),
+    }
+    return key, counters
+
+def _current_values(booking):
+    return {name: getattr(booking, name) for name in STATS_FIELDS}
+
+def _loaded_values(booking):
+    return {name: booking.get_loaded_value(name, getattr(booking, name)) for name in STATS_FIELDS}
+
+def _zone_id(booking, table_id):
+    from apps.restaurant.models import Table
+    
+    if table_id == booking.table_id:
+        return booking.table.zone_id
+    return Table.objects.values_list('zone_id', flat=True).get(pk=table_id)
+
+def _apply(key, counters, sign):
+    """Прибавить (sign=1) или вычесть (sign=-1) вклад в строку сводки"""
+    from .models import BookingDailyStats
+    
+    date, status, zone_id = key
+    rows = BookingDailyStats.objects.filter(date=date, status=status, zone_id=zone_id)
+    changes = {name: F(name) + sign * value for name, value in counters.items()}
+    if rows.update(**changes):
+        if sign < 0:
+            # Строка без бронирований не нужна; условие проверяется на уже обновленной строке
+            rows.filter(bookings_count__lte=0).delete()
+        return
+    if sign < 0:
+        # Вычитать не из чего (сводка уже расходится с бронированиями,
+        # ее выравнивает rebuild_daily_stats): строку с отрицательными
+        # значениями не создаем
+        return
+    
+    try:
+        with transaction.atomic():
+            BookingDailyStats.objects.create(
+                date=date, status=status, zone_id=zone_id,
+                **{name: sign * value for name, value in counters.items()}
+            )
+    except IntegrityError:
+        # Строку успел создать параллельный запрос
+        rows.update(**changes)
+
+def record_booking_saved(booking, created, update_fields=None):
+    """Обновить сводку после сохранения бронирования"""
+    if created:
+        _apply(*_contribution(_current_values(booking), booking.table.zone_id), 1)
+        return
+    
+    if update_fields is not None:
+        saved = {booking._meta.get_field(name).attname for name in update_fields}
+        if not saved.intersection(STATS_FIELDS):
+            return
+    
+    old_values = _loaded_values(booking)
+    new_values = _current_values(booking)
+    if old_values == new_values:
+        return
+    
+    _apply(*_contribution(old_values, _zone_id(booking, old_values['table_id'])), -1)
+    _apply(*_contribution(new_values, booking.table.zone_id), 1)
+
+def record_booking_deleted(booking):
+    """
+    Убрать удаленное бронирование из сводки.
+    
+    Вызывается для каждого удаленного бронирования, поэтому массовое
+    удаление (QuerySet.delete, каскад от столика или пользователя) стоит
+    несколько запросов на бронирование. После крупных удалений сводку
+    за период лучше пересчитать через rebuild_daily_stats (команда
+    rebuild_booking_stats).
+    """
+    values = _loaded_values(booking)
+    try:
+        zone_id = _zone_id(booking, values['table_id'])
+    except ObjectDoesNotExist:
+        # Столик удален вместе с зоной: строки сводки удалены каскадно
+        return
+    _apply(*_contribution(values, zone_id), -1)
+
+def rebuild_daily_stats(date_from=None, date_to=None):
+    """Пересчитать сводку по бронированиям целиком (или за период)"""
+    from django.db.models import Count, Q, Sum
+    from .models import Booking, BookingDailyStats
+    
+    bookings = Booking.objects.all()
+    stats = BookingDailyStats.objects.all()
+    if date_from:
+        bookings = bookings.filter(date__gte=date_from)
+        stats = stats.filter(date__gte=date_from)
+    if date_to:
+        bookings = bookings.filter(date__lte=date_to)
+        stats = stats.filter(date__lte=date_to)
+    
+    rows = bookings.values('date', 'status', 'table__zone_id').annotate(
+        bookings_count=Count('id'),
+        guests_count=Sum('guests_count'),
+        revenue=Sum('total_amount'),
+        pending_payments_count=Count('id', filter=Q(payment_status='pending')),
+        deposit_paid_count=Count('id', filter=Q(payment_status='deposit_paid')),
+    ).order_by()
+    
+    with transaction.atomic():
+        stats.delete()
+        created = BookingDailyStats.objects.bulk_create([
+            BookingDailyStats(
+                date=row['date'],
+                status=row['status'],
+                zone_id=row['table__zone_id'],
+                bookings_count=row['bookings_count'],
+                guests_count=row['guests_count'] or 0,
+                revenue=row['revenue'] or Decimal('0'),
+                pending_payments_count=row['pending_payments_count'],
+                deposit_paid_count=row['deposit_paid_count'],
+            )
+            for row in rows
+        ], batch_size=1000)
+    return len(created)
@@ -1,10 +1,15 @@
-from celery import shared_task
+import logging
+from celery import chord, shared_task
 from django.core.mail import send_mail
 from django.template.loader import render_to_string
 from django.conf import settings
 from django.utils import timezone
 from .models import Booking
-import requests
+from .outbox import flush_outbox, purge_outbox
+from .reminders import claim_due_reminders, merge_reports, send_reminders
+from .sms import SMSError, get_sms_gateway
+
+logger = logging.getLogger(__name__)
 
 @shared_task
 def send_booking_confirmation_email(booking_id):
@@ -74,9 +79,10 @@ def send_booking_status_notification(booking_id, status):
             fail_silently=False,
         )
         
-        # Отправляем SMS если есть номер телефона
+        # SMS уходит пакетным вызовом шлюза прямо из этой задачи (общий лимит
+        # частоты, без отдельной Celery-задачи на каждое сообщение)
         if booking.contact_phone:
-            send_sms_notification.delay(booking.contact_phone, status_messages.get(status, 'Статус изменен'))
+            get_sms_gateway().send_many([(booking.contact_phone, status_messages.get(status, 'Статус изменен'))])
         
         return f"Уведомление отправлено для бронирования #{booking.booking_number}"
         
@@ -89,62 +95,48 @@ def send_booking_status_notification(booking_id, status):
 def send_sms_notification(phone_number, message):
     """Отправка SMS уведомления"""
     try:
-        # Интеграция с SMS провайдером (например, Eskiz.uz)
-        sms_api_url = "https://notify.eskiz.uz/api/message/sms/send"
-        
-        payload = {
-            'mobile_phone': phone_number,
-            'message': f"Restaurant Logan: {message}",
-            'from': '4546',  # Ваш номер отправителя
-        }
-        
-        headers = {
-            'Authorization': f'Bearer {settings.SMS_API_TOKEN}',
-            'Content-Type': 'application/json'
-        }
-        
-        response = requests.post(sms_api_url, json=payload, headers=headers)
-        
-        if response.status_code == 200:
-            return f"SMS отправлено на номер {phone_number}"
-        else:
-            return f"Ошибка отправки SMS: {response.text}"
-            
-    except Exception as e:
+        get_sms_gateway().send(phone_number, message)
+        return f"SMS отправлено на номер {phone_number}"
+    except SMSError as e:
         return f"Ошибка отправки SMS: {str(e)}"
 
 @shared_task
-def send_booking_reminders():
-    """Отправка напоминаний о предстоящих бронированиях"""
-    from datetime import timedelta
-    
-    # Находим бронирования на завтра
-    tomorrow = timezone.now().date() + timedelta(days=1)
-    upcoming_bookings = Booking.objects.filter(
-        date=tomorrow,
-        status='confirmed',
-        email_confirmed=True
-    )
+def send_sms_notifications(messages):
+    """Отправка списка SMS [(телефон, текст), ...] пачками провайдера"""
+    sent, failed = get_sms_gateway().send_many(messages)
+    return {'sent': sent, 'failed': failed}
+
+@shared_task
+def dispatch_booking_reminders():
+    """
+    Отправка наступивших напоминаний о бронированиях (запускается beat).
     
-    for booking in upcoming_bookings:
-        subject = f'Напоминание о бронировании #{booking.booking_number}'
-        html_message = render_to_string('emails/booking_reminder.html', {
-            'booking': booking,
-            'site_name': 'Restaurant Logan'
-        })
-        
-        send_mail(
-            subject=subject,
-            message='',
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            recipient_list=[booking.contact_email],
-            html_message=html_message,
-            fail_silently=True,
-        )
-        
-        # Отправляем SMS напоминание
-        if booking.contact_phone:
-            message = f"Напоминание: завтра у вас бронирование в Restaurant Logan на {booking.start_time.strftime('%H:%M')}. Бронь #{booking.booking_number}"
-            send_sms_notification.delay(booking.contact_phone, message)
+    Напоминания забираются пачками по MAIL_BATCH_SIZE, пачки отправляются
+    параллельными подзадачами, а итог собирает report_reminder_batches.
+    """
+    batches = claim_due_reminders()
+    if not batches:
+        return "Нет наступивших напоминаний"
     
-    return f"Отправлено {len(upcoming_bookings)} напоминаний"
+    chord(send_booking_reminder_chunk.s(reminder_ids) for reminder_ids in batches)(report_reminder_batches.s())
+    return f"Запланировано {sum(len(reminder_ids) for reminder_ids in batches)} напоминаний в {len(batches)} порциях"
+
+@shared_task
+def send_booking_reminder_chunk(reminder_ids):
+    """Email и SMS для порции забранных напоминаний"""
+    return send_reminders(reminder_ids)
+
+@shared_task
+def report_reminder_batches(reports):
+    """Итог рассылки напоминаний по всем порциям"""
+    totals = merge_reports(reports)
+    totals['chunks'] = len(reports)
+    logger.info('Рассылка напоминаний завершена: %s', totals)
+    return totals
+
+@shared_task
+def flush_notification_outbox():
+    """Передача накопившихся уведомлений из outbox в Celery (запускается beat)"""
+    dispatched = flush_outbox()
+    purged = purge_outbox()
+    return {'dispatched': dispatched, 'purged': purged}
@@ -0,0 +1,133 @@
+from datetime import datetime, time, timedelta
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from apps.restaurant.models import Zone, Table, MenuCategory, MenuItem
+from apps.restaurant.settings_cache import get_restaurant_settings
+from .models import Booking, BookingMenuItem, Payment
+from .outbox import enqueue_notification
+from .tasks import send_booking_confirmation_email
+
+User = get_user_model()
+
+def _at(days, hour):
+    """Время через days дней в hour часов (местное время)"""
+    date = timezone.localdate() + timedelta(days=days)
+    return timezone.make_aware(datetime.combine(date, time(hour)))
+
+class BookingCreateQueriesTest(TestCase):
+    """Число запросов при создании бронирования не зависит от числа блюд"""
+
+    # Столик, проверка пересечения, блюда, бронирование, история, статистика дня,
+    # напоминания, позиции предзаказа, outbox и 6 команд транзакции/точек сохранения
+    CREATE_QUERIES = 15
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(email='guest@example.com', username='guest', password='password')
+        zone = Zone.objects.create(name='Основной зал', slug='main')
+        self.tables = [
+            Table.objects.create(name=f'Столик {number}', zone=zone, capacity=4, price_per_hour=100)
+            for number in range(1, 4)
+        ]
+        category = MenuCategory.objects.create(name='Горячее', slug='hot')
+        self.menu_items = [
+            MenuItem.objects.create(category=category, name=f'Блюдо {number}', slug=f'dish-{number}', price=10 + number)
+            for number in range(1, 6)
+        ]
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        # Прогрев: настройки в кэше, блок номеров выделен, строка статистики дня создана
+        self._create(self.tables[2], [])
+
+    def _create(self, table, menu_items):
+        response = self.client.post(reverse('bookings:booking-list-create'), {
+            'table': table.id,
+            'start_time': _at(1, 12).isoformat(),
+            'end_time': _at(1, 14).isoformat(),
+            'guests_count': 2,
+            'selected_menu_items': [
+                {'menu_item_id': menu_item.id, 'quantity': 2} for menu_item in menu_items
+            ],
+        }, format='json')
+        self.assertEqual(response.status_code, 201, response.data)
+        return response
+
+    def test_one_dish(self):
+        with self.assertNumQueries(self.CREATE_QUERIES):
+            self._create(self.tables[0], self.menu_items[:1])
+        self.assertEqual(Booking.objects.latest('id').menu_items.count(), 1)
+
+    def test_many_dishes(self):
+        with self.assertNumQueries(self.CREATE_QUERIES):
+            self._create(self.tables[0], self.menu_items)
+        booking = Booking.objects.latest('id')
+        self.assertEqual(booking.menu_items.count(), len(self.menu_items))
+        self.assertEqual(booking.total_amount, booking.table_price + sum(2 * item.price for item in self.menu_items))
+
+class BookingListQueriesTest(TestCase):
+    """Число запросов списков бронирований не зависит от числа строк"""
+
+    API_QUERIES = {
+        '/api/bookings/': 4,
+        '/api/bookings/history/': 1,
+        '/api/bookings/payments/': 1,
+    }
+    ADMIN_QUERIES = {
+        '/admin/bookings/booking/': 9,
+        '/admin/bookings/bookingmenuitem/': 7,
+        '/admin/bookings/bookinghistory/': 9,
+        '/admin/bookings/bookingdailystats/': 9,
+        '/admin/bookings/notificationoutbox/': 7,
+    }
+
+    def setUp(self):
+        cache.clear()
+        # Настройки ресторана загружаются в память процесса заранее
+        get_restaurant_settings()
+        self.user = User.objects.create_user(email='guest@example.com', username='guest', password='password')
+        admin = User.objects.create_superuser(email='admin@example.com', username='admin', password='password')
+        zone = Zone.objects.create(name='Основной зал', slug='main')
+        self.table = Table.objects.create(name='Столик 1', zone=zone, capacity=4, price_per_hour=100)
+        category = MenuCategory.objects.create(name='Горячее', slug='hot')
+        self.menu_item = MenuItem.objects.create(category=category, name='Плов', slug='plov', price=50)
+        self.api_client = APIClient()
+        self.api_client.force_authenticate(self.user)
+        self.admin_client = APIClient()
+        self.admin_client.force_login(admin)
+        self._add_bookings(1)
+
+    def _add_bookings(self, count):
+        offset = Booking.objects.count()
+        for days in range(offset + 1, offset + count + 1):
+            booking = Booking(
+                user=self.user,
+                table=self.table,
+                start_time=_at(days, 12),
+                end_time=_at(days, 14),
+                guests_count=2,
+                contact_email='guest@example.com',
+            )
+            booking.save()
+            BookingMenuItem.objects.create(booking=booking, menu_item=self.menu_item, quantity=1, price_per_item=50)
+            Payment.objects.create(booking=booking, payment_id=f'payment-{booking.pk}', amount=50, method='cash')
+            enqueue_notification(send_booking_confirmation_email, booking.id, booking=booking)
+
+    def _assert_queries(self, client, expected):
+        for url, queries in expected.items():
+            with self.subTest(url=url), self.assertNumQueries(queries):
+                response = client.get(url)
+                self.assertEqual(response.status_code, 200)
+
+    def test_api_lists(self):
+        self._assert_queries(self.api_client, self.API_QUERIES)
+        self._add_bookings(5)
+        self._assert_queries(self.api_client, self.API_QUERIES)
+
+    def test_admin_changelists(self):
+        self._assert_queries(self.admin_client, self.ADMIN_QUERIES)
+        self._add_bookings(5)
+        self._assert_queries(self.admin_client, self.ADMIN_QUERIES)
@@ -7,6 +7,8 @@ urlpatterns = [
     # Основные операции с бронированиями
     path('', views.BookingListCreateView.as_view(), name='booking-list-create'),
     path('<int:pk>/', views.BookingDetailView.as_view(), name='booking-detail'),
+    path('history/', views.BookingHistoryListView.as_view(), name='booking-history'),
+    path('payments/', views.PaymentListView.as_view(), name='payment-list'),
     
     # Управление бронированиями
     path('<int:pk>/confirm/', views.confirm_booking, name='confirm-booking'),
@@ -17,10 +19,18 @@ urlpatterns = [
     
     # Доступные слоты
     path('available-slots/', views.available_time_slots, name='available-slots'),
+    path('available-tables/', views.available_tables, name='available-tables'),
+    path('next-available/', views.next_available, name='next-available'),
     
     # Платежи
     path('<int:booking_id>/payment/', views.create_payment, name='create-payment'),
     
     # Ст��тистика
     path('statistics/', views.booking_statistics, name='booking-statistics'),
+    
+    # Очередь уведомлений
+    path('notifications/metrics/', views.notification_metrics, name='notification-metrics'),
+    
+    # Выгрузка для бухгалтерии
+    path('export/<str:dataset>/', views.export_bookings, name='booking-export'),
 ]
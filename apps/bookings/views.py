@@ -1,19 +1,39 @@
 from rest_framework import generics, permissions, status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
+from django_filters.rest_framework import DjangoFilterBackend
+from django.db import transaction
+from django.db.models import Q, Sum
 from django.utils import timezone
-from datetime import datetime, timedelta
-from .models import Booking, BookingMenuItem, Payment
+from datetime import timedelta
+from apps.core.conditional import ConditionalGetMixin, make_etag
+from apps.core.eager_loading import EagerLoadingMixin
+from apps.core.streaming import StreamingListMixin
+from apps.restaurant.catalog_cache import normalize_query_params
+from apps.restaurant.models import Table
+from apps.restaurant.settings_cache import get_restaurant_settings
+from .availability import DayAvailability, find_next_available, serialize_slot
+from .export import EXPORT_DATASETS, EXPORT_FORMATS, export_filename, iter_export
+from .models import Booking, BookingMenuItem, BookingHistory, BookingDailyStats, Payment
+from .outbox import enqueue_notification, outbox_metrics
+from .pagination import BookingCursorPagination, CreatedAtCursorPagination
+from .tasks import send_booking_status_notification
 from .serializers import (
-    BookingSerializer, BookingCreateSerializer, AvailableTimeSlotsSerializer,
-    EmailConfirmationSerializer
+    BookingSerializer, BookingCreateSerializer, BookingHistorySerializer, PaymentSerializer,
+    AvailableTimeSlotsSerializer, BookingExportQuerySerializer,
+    TableAvailabilitySearchSerializer, NextAvailableSearchSerializer, EmailConfirmationSerializer
 )
 
-class BookingListCreateView(generics.ListCreateAPIView):
+class BookingListCreateView(StreamingListMixin, EagerLoadingMixin, generics.ListCreateAPIView):
     """Список и создание бронирований"""
     
+    queryset = Booking.objects.all()
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = BookingCursorPagination
+    ordering_fields = ['start_time', 'created_at']
+    ordering = ['-start_time', '-id']
     
     def get_serializer_class(self):
         if self.request.method == 'POST':
@@ -21,22 +41,84 @@ class BookingListCreateView(generics.ListCreateAPIView):
         return BookingSerializer
     
     def get_queryset(self):
+        queryset = super().get_queryset()
         user = self.request.user
         if user.is_staff:
-            return Booking.objects.all().select_related('user', 'table').prefetch_related('menu_items', 'payments')
-        return Booking.objects.filter(user=user).select_related('table').prefetch_related('menu_items', 'payments')
+            return queryset
+        return queryset.filter(user=user)
 
-class BookingDetailView(generics.RetrieveUpdateDestroyAPIView):
+class BookingDetailView(ConditionalGetMixin, EagerLoadingMixin, generics.RetrieveUpdateDestroyAPIView):
     """Детали, обновление и удаление бронирования"""
     
+    queryset = Booking.objects.all()
     serializer_class = BookingSerializer
     permission_classes = [permissions.IsAuthenticated]
     
     def get_queryset(self):
+        queryset = super().get_queryset()
         user = self.request.user
         if user.is_staff:
-            return Booking.objects.all()
-        return Booking.objects.filter(user=user)
+            return queryset
+        return queryset.filter(user=user)
+    
+    def get_validators(self, request):
+        """
+        ETag по updated_at и версии бронирования (одна строка по первичному ключу).
+        
+        Изменения предзаказа и платежей увеличивают Booking.version.
+        can_be_cancelled и is_active зависят от текущего времени, поэтому
+        в ETag входят их вычисленные значения. Last-Modified не отдается:
+        у смены этих флагов по времени нет даты изменения.
+        """
+        row = self.get_queryset().select_related(None).prefetch_related(None).filter(
+            pk=self.kwargs['pk']
+        ).values_list('updated_at', 'version', 'status', 'start_time', 'end_time').first()
+        if row is None:
+            return None, None
+        
+        updated_at, version, booking_status, start_time, end_time = row
+        # Значения, зависящие от времени, считаются той же логикой, что и в модели
+        probe = Booking(status=booking_status, start_time=start_time, end_time=end_time)
+        etag = make_etag(
+            self.kwargs['pk'], updated_at.isoformat(), version,
+            probe.can_be_cancelled, probe.is_active,
+            normalize_query_params(request.query_params)
+        )
+        return etag, None
+
+class BookingHistoryListView(EagerLoadingMixin, generics.ListAPIView):
+    """История изменений бронирований"""
+    
+    queryset = BookingHistory.objects.all()
+    serializer_class = BookingHistorySerializer
+    permission_classes = [permissions.IsAuthenticated]
+    pagination_class = CreatedAtCursorPagination
+    filter_backends = [DjangoFilterBackend]
+    filterset_fields = ['booking']
+    
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        user = self.request.user
+        if user.is_staff:
+            return queryset
+        return queryset.filter(booking__user=user)
+
+class PaymentListView(EagerLoadingMixin, generics.ListAPIView):
+    """Список платежей"""
+    
+    queryset = Payment.objects.all()
+    serializer_class = PaymentSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    pagination_class = CreatedAtCursorPagination
+    filter_backends = [DjangoFilterBackend]
+    filterset_fields = ['booking', 'status', 'method']
+    
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        user = self.request.user
+        if user.is_staff:
+            return queryset
+        return queryset.filter(booking__user=user)
 
 @api_view(['POST'])
 @permission_classes([permissions.IsAuthenticated])
@@ -48,11 +130,10 @@ def confirm_booking(request, pk):
         return Response({'error': 'Недостаточно прав'}, status=status.HTTP_403_FORBIDDEN)
     
     if booking.status == 'pending':
-        booking.confirm()
-        
-        # Отправляем SMS/Email уведомление
-        from .tasks import send_booking_status_notification
-        send_booking_status_notification.delay(booking.id, 'confirmed')
+        # SMS/Email уведомление уходит в outbox в той же транзакции
+        with transaction.atomic():
+            booking.confirm()
+            enqueue_notification(send_booking_status_notification, booking.id, 'confirmed', booking=booking, coalesce=True)
         
         return Response({'message': 'Бронирование подтверждено'})
     
@@ -70,11 +151,10 @@ def cancel_booking(request, pk):
     
     if booking.can_be_cancelled:
         reason = request.data.get('reason', 'Отменено пользователем')
-        booking.cancel(reason)
-        
-        # Отправляем SMS/Email уведомление
-        from .tasks import send_booking_status_notification
-        send_booking_status_notification.delay(booking.id, 'cancelled')
+        # SMS/Email уведомление уходит в outbox в той же транзакции
+        with transaction.atomic():
+            booking.cancel(reason)
+            enqueue_notification(send_booking_status_notification, booking.id, 'cancelled', booking=booking, coalesce=True)
         
         return Response({'message': 'Бронирование отменено'})
     
@@ -111,51 +191,20 @@ def available_time_slots(request):
     duration = serializer.validated_data.get('duration', 120)
     
     try:
-        from apps.restaurant.models import Table, RestaurantSettings
         table = Table.objects.get(id=table_id, is_active=True)
         
         # Получаем настройки ресторана
         try:
-            settings = RestaurantSettings.objects.first()
-            opening_time = settings.opening_time if settings else datetime.strptime('10:00', '%H:%M').time()
-            closing_time = settings.closing_time if settings else datetime.strptime('22:00', '%H:%M').time()
-            booking_interval = settings.booking_interval if settings else 30
+            settings = get_restaurant_settings()
         except:
-            opening_time = datetime.strptime('10:00', '%H:%M').time()
-            closing_time = datetime.strptime('22:00', '%H:%M').time()
-            booking_interval = 30
-        
-        # Получаем существующие бронирования на эту дату
-        existing_bookings = Booking.objects.filter(
-            table=table,
-            date=date,
-            status__in=['confirmed', 'active', 'pending']
-        ).order_by('start_time')
-        
-        # Генерируем доступные слоты
-        available_slots = []
-        current_time = datetime.combine(date, opening_time)
-        end_of_day = datetime.combine(date, closing_time)
+            settings = None
         
-        while current_time + timedelta(minutes=duration) <= end_of_day:
-            slot_end = current_time + timedelta(minutes=duration)
-            
-            # Проверяем, не пересекается ли слот с существующими бронированиями
-            is_available = True
-            for booking in existing_bookings:
-                if (current_time < booking.end_time and slot_end > booking.start_time):
-                    is_available = False
-                    break
-            
-            if is_available:
-                available_slots.append({
-                    'start_time': current_time.strftime('%H:%M'),
-                    'end_time': slot_end.strftime('%H:%M'),
-                    'datetime_start': current_time.isoformat(),
-                    'datetime_end': slot_end.isoformat()
-                })
-            
-            current_time += timedelta(minutes=booking_interval)
+        # Строим сетку занятости столика на дату и ищем свободные окна
+        availability = DayAvailability.for_tables(date, [table.id], settings=settings)
+        available_slots = [
+            serialize_slot(slot_start, slot_end)
+            for slot_start, slot_end in availability.free_slots(table.id, duration)
+        ]
         
         return Response({
             'date': date,
@@ -168,6 +217,125 @@ def available_time_slots(request):
     except Exception as e:
         return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+def _eligible_tables(guests_count, zone_id=None, is_vip=None):
+    """Активные столики, подходящие по количеству гостей и фильтрам"""
+    tables = Table.objects.filter(
+        is_active=True,
+        capacity__gte=guests_count,
+        min_capacity__lte=guests_count
+    ).select_related('zone')
+    if zone_id is not None:
+        tables = tables.filter(zone_id=zone_id)
+    if is_vip is not None:
+        tables = tables.filter(is_vip=is_vip)
+    return list(tables)
+
+@api_view(['GET'])
+@permission_classes([permissions.AllowAny])
+def available_tables(request):
+    """Свободные слоты всех подходящих столиков на дату за один запрос"""
+    serializer = TableAvailabilitySearchSerializer(data=request.GET)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    
+    date = serializer.validated_data['date']
+    duration = serializer.validated_data['duration']
+    guests_count = serializer.validated_data['guests_count']
+    zone_id = serializer.validated_data.get('zone')
+    is_vip = serializer.validated_data.get('is_vip')
+    
+    tables = _eligible_tables(guests_count, zone_id, is_vip)
+    
+    try:
+        settings = get_restaurant_settings()
+    except:
+        settings = None
+    
+    # Одна выборка бронирований на весь день, группировка по столикам в памяти
+    availability = DayAvailability.for_tables(date, [table.id for table in tables], settings=settings)
+    
+    tables_data = []
+    for table in tables:
+        slots = availability.free_slots(table.id, duration)
+        if not slots:
+            continue
+        tables_data.append({
+            'table_id': table.id,
+            'table_name': table.name,
+            'zone_id': table.zone_id,
+            'zone_name': table.zone.name,
+            'capacity': table.capacity,
+            'min_capacity': table.min_capacity,
+            'is_vip': table.is_vip,
+            'price_per_hour': table.price_per_hour,
+            'available_slots': [serialize_slot(slot_start, slot_end) for slot_start, slot_end in slots],
+        })
+    
+    return Response({
+        'date': date,
+        'guests_count': guests_count,
+        'duration': duration,
+        'tables': tables_data
+    })
+
+@api_view(['GET'])
+@permission_classes([permissions.AllowAny])
+def next_available(request):
+    """Ближайшие свободные варианты (столик, время) в пределах горизонта бронирования"""
+    serializer = NextAvailableSearchSerializer(data=request.GET)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    
+    today = timezone.localdate()
+    start_date = serializer.validated_data.get('date') or today
+    duration = serializer.validated_data['duration']
+    guests_count = serializer.validated_data['guests_count']
+    limit = serializer.validated_data['limit']
+    
+    tables = _eligible_tables(
+        guests_count,
+        serializer.validated_data.get('zone'),
+        serializer.validated_data.get('is_vip')
+    )
+    tables_by_id = {table.id: table for table in tables}
+    
+    try:
+        settings = get_restaurant_settings()
+        advance_days = settings.booking_advance_days if settings else 30
+    except:
+        settings = None
+        advance_days = 30
+    
+    options = find_next_available(
+        tables_by_id.keys(),
+        start_date,
+        today + timedelta(days=advance_days),
+        duration,
+        limit,
+        settings=settings,
+        not_before=timezone.now()
+    )
+    
+    results = []
+    for slot_start, slot_end, table_id in options:
+        table = tables_by_id[table_id]
+        results.append({
+            'table_id': table.id,
+            'table_name': table.name,
+            'zone_id': table.zone_id,
+            'zone_name': table.zone.name,
+            'capacity': table.capacity,
+            'is_vip': table.is_vip,
+            'date': timezone.localtime(slot_start).date(),
+            **serialize_slot(slot_start, slot_end),
+        })
+    
+    return Response({
+        'guests_count': guests_count,
+        'duration': duration,
+        'options': results
+    })
+
 @api_view(['POST'])
 @permission_classes([permissions.IsAuthenticated])
 def create_payment(request, booking_id):
@@ -231,17 +399,48 @@ def booking_statistics(request):
     """Статистика бронирований"""
     today = timezone.now().date()
     
-    stats = {
-        'total_bookings': Booking.objects.count(),
-        'today_bookings': Booking.objects.filter(date=today).count(),
-        'pending_bookings': Booking.objects.filter(status='pending').count(),
-        'confirmed_bookings': Booking.objects.filter(status='confirmed').count(),
-        'active_bookings': Booking.objects.filter(status='active').count(),
-        'completed_bookings': Booking.objects.filter(status='completed').count(),
-        'cancelled_bookings': Booking.objects.filter(status='cancelled').count(),
-        'total_revenue': sum(b.total_amount for b in Booking.objects.filter(status='completed')),
-        'pending_payments': Booking.objects.filter(payment_status='pending').count(),
-        'deposit_paid': Booking.objects.filter(payment_status='deposit_paid').count(),
-    }
+    # Один запрос с условными агрегатами по дневной сводке
+    totals = BookingDailyStats.objects.aggregate(
+        total_bookings=Sum('bookings_count'),
+        today_bookings=Sum('bookings_count', filter=Q(date=today)),
+        pending_bookings=Sum('bookings_count', filter=Q(status='pending')),
+        confirmed_bookings=Sum('bookings_count', filter=Q(status='confirmed')),
+        active_bookings=Sum('bookings_count', filter=Q(status='active')),
+        completed_bookings=Sum('bookings_count', filter=Q(status='completed')),
+        cancelled_bookings=Sum('bookings_count', filter=Q(status='cancelled')),
+        total_revenue=Sum('revenue', filter=Q(status='completed')),
+        pending_payments=Sum('pending_payments_count'),
+        deposit_paid=Sum('deposit_paid_count'),
+    )
+    
+    stats = {key: value or 0 for key, value in totals.items()}
     
     return Response(stats)
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAdminUser])
+def export_bookings(request, dataset):
+    """Потоковая выгрузка бронирований, блюд предзаказа или платежей (csv/ndjson)"""
+    if dataset not in EXPORT_DATASETS:
+        return Response({'error': 'Неизвестный тип выгрузки'}, status=status.HTTP_404_NOT_FOUND)
+    
+    serializer = BookingExportQuerySerializer(data=request.GET)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    
+    date_from = serializer.validated_data['date_from']
+    date_to = serializer.validated_data['date_to']
+    output = serializer.validated_data['output']
+    
+    response = StreamingHttpResponse(
+        iter_export(dataset, date_from, date_to, output),
+        content_type=EXPORT_FORMATS[output]
+    )
+    response['Content-Disposition'] = f'attachment; filename="{export_filename(dataset, date_from, date_to, output)}"'
+    return response
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAdminUser])
+def notification_metrics(request):
+    """Метрики очереди уведомлений: ожидают, переданы, сэкономлено объединением"""
+    return Response(outbox_metrics())
@@ -0,0 +1,47 @@
+"""Условные GET-запросы (ETag / Last-Modified) для представлений DRF"""
+import hashlib
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+def make_etag(*parts, weak=False):
+    """ETag из частей отпечатка; weak — для семантически равных ответов"""
+    digest = hashlib.md5('|'.join(str(part) for part in parts).encode()).hexdigest()
+    return ('W/' if weak else '') + quote_etag(digest)
+
+def conditional_response(request, etag=None, last_modified=None):
+    """Ответ 304/412, если у клиента актуальная версия, иначе None"""
+    if request.method not in ('GET', 'HEAD') or (etag is None and last_modified is None):
+        return None
+    timestamp = int(last_modified.timestamp()) if last_modified else None
+    response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+    if response is not None:
+        set_validators(response, etag, last_modified)
+    return response
+
+def set_validators(response, etag=None, last_modified=None):
+    """Заголовки ETag и Last-Modified успешного ответа"""
+    if etag and not response.has_header('ETag'):
+        response['ETag'] = etag
+    if last_modified and not response.has_header('Last-Modified'):
+        response['Last-Modified'] = http_date(last_modified.timestamp())
+    return response
+
+class ConditionalGetMixin:
+    """
+    Ответ 304 без выборки и сериализации данных.
+    
+    Представление реализует get_validators(request) -> (etag, last_modified),
+    вычисляя их дешево: по версиям кэша каталога или агрегату updated_at.
+    Права доступа проверяются DRF до вызова get().
+    """
+    
+    def get(self, request, *args, **kwargs):
+        etag, last_modified = self.get_validators(request)
+        response = conditional_response(request, etag, last_modified)
+        if response is not None:
+            return response
+        
+        response = super().get(request, *args, **kwargs)
+        if response.status_code == 200:
+            set_validators(response, etag, last_modified)
+        return response
@@ -0,0 +1,91 @@
+"""Автоматическая загрузка связанных объектов по полям сериализатора"""
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch
+from rest_framework import serializers
+
+class LoadPlan:
+    """
+    План загрузки связей для одной модели.
+    
+    select — пути для select_related, prefetch — {путь: (модель, вложенный план)}.
+    """
+    
+    def __init__(self):
+        self.select = set()
+        self.prefetch = {}
+    
+    def nested(self, path, model):
+        if path not in self.prefetch:
+            self.prefetch[path] = (model, LoadPlan())
+        return self.prefetch[path][1]
+    
+    def apply(self, queryset):
+        if self.select:
+            queryset = queryset.select_related(*sorted(self.select))
+        prefetches = [
+            Prefetch(path, queryset=plan.apply(model._default_manager.all()))
+            for path, (model, plan) in sorted(self.prefetch.items())
+        ]
+        if prefetches:
+            queryset = queryset.prefetch_related(*prefetches)
+        return queryset
+
+def _serializer_fields(serializer):
+    if isinstance(serializer, serializers.ListSerializer):
+        serializer = serializer.child
+    if not isinstance(serializer, serializers.Serializer):
+        return {}
+    return serializer.fields
+
+def _collect(serializer, model, plan, prefix=''):
+    """Обход полей сериализатора с накоплением путей в plan"""
+    for field in _serializer_fields(serializer).values():
+        if field.write_only:
+            continue
+        
+        source_attrs = field.source_attrs
+        if isinstance(field, serializers.RelatedField) and field.use_pk_only_optimization():
+            # Для вывода первичного ключа связанный объект не нужен
+            source_attrs = source_attrs[:-1]
+        
+        current_model, current_plan, path = model, plan, prefix
+        for attr in source_attrs:
+            try:
+                model_field = current_model._meta.get_field(attr)
+            except FieldDoesNotExist:
+                # Свойство или метод модели: дальше путь не разобрать
+                current_model = None
+                break
+            if not model_field.is_relation or model_field.related_model is None:
+                current_model = None
+                break
+            
+            path = '{}__{}'.format(path, attr) if path else attr
+            current_model = model_field.related_model
+            if model_field.many_to_many or model_field.one_to_many:
+                # Множественная связь: дальнейшие пути — во вложенный Prefetch
+                current_plan = current_plan.nested(path, current_model)
+                path = ''
+            else:
+                current_plan.select.add(path)
+        
+        if current_model is not None and isinstance(field, (serializers.Serializer, serializers.ListSerializer)):
+            _collect(field, current_model, current_plan, path)
+
+def eager_load(queryset, serializer):
+    """Добавляет к queryset select_related/prefetch_related для полей сериализатора"""
+    plan = LoadPlan()
+    _collect(serializer, queryset.model, plan)
+    return plan.apply(queryset)
+
+class EagerLoadingMixin:
+    """
+    Примесь для generic-представлений DRF.
+    
+    Связи, которые выводит сериализатор (вложенные сериализаторы и пути
+    source='a.b'), загружаются через select_related и вложенные Prefetch,
+    поэтому новые вложенные поля не добавляют запросов на каждую строку.
+    """
+    
+    def get_queryset(self):
+        return eager_load(super().get_queryset(), self.get_serializer())
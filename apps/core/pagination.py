@@ -0,0 +1,125 @@
+import json
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import Cursor, CursorPagination
+
+class KeysetCursorPagination(CursorPagination):
+    """
+    Курсорная пагинация по всем полям сортировки (keyset).
+    
+    Стандартный CursorPagination фильтрует только по первому полю, а записи
+    с одинаковым значением пропускает через OFFSET. Здесь курсор хранит
+    значения всех полей сортировки, последним из которых всегда идет id,
+    поэтому страница выбирается условием по составному индексу без OFFSET
+    и без COUNT(*), и дальние страницы стоят столько же, сколько первая.
+    
+    Пагинация включается только параметром cursor или page_size: без них
+    возвращается весь список, как ожидают существующие клиенты.
+    """
+    
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+    
+    def get_page_size(self, request):
+        if self.cursor_query_param not in request.query_params and self.page_size_query_param not in request.query_params:
+            return None
+        return super().get_page_size(request)
+    
+    def get_ordering(self, request, queryset, view):
+        ordering = tuple(super().get_ordering(request, queryset, view))
+        if not any(field.lstrip('-') in ('id', 'pk') for field in ordering):
+            ordering += ('-id' if ordering[0].startswith('-') else 'id',)
+        return ordering
+    
+    def _get_position_from_instance(self, instance, ordering):
+        values = []
+        for field in ordering:
+            name = field.lstrip('-')
+            value = instance[name] if isinstance(instance, dict) else getattr(instance, name)
+            values.append(str(value))
+        return json.dumps(values)
+    
+    def _position_filter(self, position, reverse):
+        """Условие "после позиции" в порядке выборки: (a, b) > (x, y) по направлениям полей"""
+        try:
+            values = json.loads(position)
+        except ValueError:
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(values, list) or len(values) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        
+        after = Q()
+        equal = Q()
+        for index, (field, value) in enumerate(zip(self.ordering, values)):
+            name = field.lstrip('-')
+            descending = field.startswith('-') != reverse
+            after |= equal & Q(**{name + ('__lt' if descending else '__gt'): value})
+            equal &= Q(**{name: value})
+            if index == 0:
+                # Граница по первому полю позволяет БД сузить просмотр индекса
+                bound = Q(**{name + ('__lte' if descending else '__gte'): value})
+        return bound & after
+    
+    def paginate_queryset(self, queryset, request, view=None):
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+        
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        
+        self.cursor = self.decode_cursor(request)
+        if self.cursor is None:
+            reverse, current_position = False, None
+        else:
+            reverse, current_position = self.cursor.reverse, self.cursor.position
+        
+        if reverse:
+            queryset = queryset.order_by(*(
+                field[1:] if field.startswith('-') else '-' + field for field in self.ordering
+            ))
+        else:
+            queryset = queryset.order_by(*self.ordering)
+        
+        if current_position is not None:
+            queryset = queryset.filter(self._position_filter(current_position, reverse))
+        
+        # Лишняя запись показывает, есть ли следующая страница
+        results = list(queryset[:self.page_size + 1])
+        self.page = results[:self.page_size]
+        
+        if len(results) > len(self.page):
+            following_position = self._get_position_from_instance(self.page[-1], self.ordering)
+        else:
+            following_position = None
+        
+        if reverse:
+            self.page = list(reversed(self.page))
+            self.has_next = current_position is not None
+            self.has_previous = following_position is not None
+            self.next_position = current_position
+            self.previous_position = following_position
+        else:
+            self.has_next = following_position is not None
+            self.has_previous = current_position is not None
+            self.next_position = following_position
+            self.previous_position = current_position
+        
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+        
+        return self.page
+    
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        # Позиции уникальны (последнее поле — id), смещение не требуется
+        position = self._get_position_from_instance(self.page[-1], self.ordering) if self.page else self.next_position
+        return self.encode_cursor(Cursor(offset=0, reverse=False, position=position))
+    
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        position = self._get_position_from_instance(self.page[0], self.ordering) if self.page else self.previous_position
+        return self.encode_cursor(Cursor(offset=0, reverse=True, position=position))
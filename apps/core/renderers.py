@@ -0,0 +1,42 @@
+"""
+Быстрый JSON-рендерер DRF на orjson.
+
+Если orjson не установлен или запрошен формат, который orjson не
+поддерживает (отступы, ensure_ascii), используется стандартный JSONRenderer.
+"""
+from rest_framework.utils import encoders
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# datetime/time отдаются кодировщику DRF: формат совпадает со стандартным рендерером
+ORJSON_OPTIONS = (orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS) if orjson else 0
+
+# Decimal, datetime, ленивые строки перевода, QuerySet и т. п.
+_drf_encoder = encoders.JSONEncoder()
+
+def orjson_dumps(data):
+    """Сериализация в байты JSON с теми же правилами, что у JSONEncoder DRF"""
+    return orjson.dumps(data, default=_drf_encoder.default, option=ORJSON_OPTIONS)
+
+class FastJSONRenderer(JSONRenderer):
+    """JSONRenderer с сериализацией через orjson"""
+    
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or self.ensure_ascii:
+            return super().render(data, accepted_media_type, renderer_context)
+        
+        if self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+        
+        if data is None:
+            return b''
+        
+        ret = orjson_dumps(data)
+        # Как и JSONRenderer, экранируем разделители строк, недопустимые в JavaScript
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
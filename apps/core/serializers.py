@@ -0,0 +1,34 @@
+from rest_framework import permissions, serializers
+
+def _split_param(value):
+    return {name.strip() for name in (value or '').split(',') if name.strip()}
+
+class SparseFieldsMixin:
+    """
+    Выбор полей ответа параметрами запроса ?fields= и ?expand=.
+    
+    Без параметров сериализатор отдает полное представление. ?fields=a,b
+    оставляет только перечисленные поля. ?expand= добавляет дорогие поля
+    из Meta.expandable_fields, которые при указании одного expand
+    (без fields) не выводятся. Параметры действуют только на сериализатор
+    верхнего уровня и только для чтения (GET/HEAD/OPTIONS).
+    """
+    
+    def _is_top_level(self):
+        parent = self.parent
+        return parent is None or (isinstance(parent, serializers.ListSerializer) and parent.parent is None)
+    
+    def get_fields(self):
+        fields = super().get_fields()
+        request = self.context.get('request')
+        if request is None or request.method not in permissions.SAFE_METHODS or not self._is_top_level():
+            return fields
+        
+        requested = _split_param(request.query_params.get('fields'))
+        expand = _split_param(request.query_params.get('expand'))
+        if not requested and not expand:
+            return fields
+        
+        expandable = set(getattr(self.Meta, 'expandable_fields', ()))
+        allowed = (requested or set(fields) - expandable) | expand
+        return {name: field for name, field in fields.items() if name in allowed}
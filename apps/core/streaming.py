@@ -0,0 +1,58 @@
+from itertools import islice
+from django.http import StreamingHttpResponse
+
+class StreamingListMixin:
+    """
+    Потоковая выдача списка для ListAPIView (?stream=1).
+    
+    Queryset читается серверным курсором порциями по stream_chunk_size,
+    каждая порция сериализуется и отдается фрагментом JSON-массива через
+    StreamingHttpResponse. В памяти одновременно находится только одна
+    порция, поэтому потребление памяти не зависит от размера выборки.
+    Пагинация в потоковом режиме не применяется.
+    """
+    
+    stream_query_param = 'stream'
+    stream_chunk_size = 500
+    
+    def is_streaming(self, request):
+        return request.query_params.get(self.stream_query_param, '').lower() in ('1', 'true', 'yes')
+    
+    def list(self, request, *args, **kwargs):
+        if not self.is_streaming(request):
+            return super().list(request, *args, **kwargs)
+        
+        queryset = self.filter_queryset(self.get_queryset())
+        return StreamingHttpResponse(
+            self.stream_rendered_list(queryset),
+            content_type=request.accepted_renderer.media_type
+        )
+    
+    def stream_rendered_list(self, queryset):
+        """Фрагменты JSON-массива: '[', порции через ',', ']'"""
+        renderer = self.request.accepted_renderer
+        renderer_context = self.get_renderer_context()
+        objects = queryset.iterator(chunk_size=self.stream_chunk_size)
+        
+        yield b'['
+        separator = b''
+        while True:
+            body = self.render_chunk(list(islice(objects, self.stream_chunk_size)), renderer, renderer_context)
+            if body is None:
+                break
+            if body:
+                yield separator + body
+                separator = b','
+        yield b']'
+    
+    def render_chunk(self, chunk, renderer, renderer_context):
+        """
+        Элементы порции без обрамляющих скобок массива (None - данные закончились).
+        
+        Объекты и сериализованные данные порции живут только внутри
+        этого вызова и освобождаются до чтения следующей порции.
+        """
+        if not chunk:
+            return None
+        data = self.get_serializer(chunk, many=True).data
+        return renderer.render(data, self.request.accepted_media_type, renderer_context).strip()[1:-1].strip()
@@ -1,9 +1,11 @@
 from django.contrib import admin
+from django.contrib.admin.views.main import ChangeList
 from django.utils.html import format_html
 from django.urls import path
 from django.shortcuts import render
 from django.http import JsonResponse
 from .models import Zone, Table, MenuCategory, MenuItem, RestaurantSettings
+from .table_status import resolve_table_statuses
 
 @admin.register(Zone)
 class ZoneAdmin(admin.ModelAdmin):
@@ -15,9 +17,20 @@ class ZoneAdmin(admin.ModelAdmin):
     prepopulated_fields = {'slug': ('name',)}
     ordering = ['sort_order', 'name']
     
+    def get_queryset(self, request):
+        return super().get_queryset(request).with_counts()
+    
     def tables_count(self, obj):
-        return obj.tables.count()
+        return obj.active_tables_count
     tables_count.short_description = 'Количество столиков'
+    tables_count.admin_order_field = '_active_tables_count'
+
+class TableChangeList(ChangeList):
+    """Список столиков в админке со статусами, вычисленными одним запросом"""
+    
+    def get_results(self, request):
+        super().get_results(request)
+        resolve_table_statuses(self.result_list)
 
 @admin.register(Table)
 class TableAdmin(admin.ModelAdmin):
@@ -46,6 +59,9 @@ class TableAdmin(admin.ModelAdmin):
         }),
     )
     
+    def get_changelist(self, request, **kwargs):
+        return TableChangeList
+    
     def current_status(self, obj):
         status = obj.current_status
         colors = {
@@ -108,15 +124,24 @@ class TableAdmin(admin.ModelAdmin):
 class MenuCategoryAdmin(admin.ModelAdmin):
     """Админ-панель для категорий меню"""
     
-    list_display = ['name', 'slug', 'is_active', 'sort_order', 'items_count']
+    list_display = ['name', 'slug', 'is_active', 'sort_order', 'items_count', 'available_items_count']
     list_filter = ['is_active']
     search_fields = ['name', 'description']
     prepopulated_fields = {'slug': ('name',)}
     ordering = ['sort_order', 'name']
     
+    def get_queryset(self, request):
+        return super().get_queryset(request).with_counts()
+    
     def items_count(self, obj):
-        return obj.items.count()
+        return obj.items_count
     items_count.short_description = 'Количество блюд'
+    items_count.admin_order_field = '_items_count'
+    
+    def available_items_count(self, obj):
+        return obj.available_items_count
+    available_items_count.short_description = 'Доступно блюд'
+    available_items_count.admin_order_field = '_available_items_count'
 
 @admin.register(MenuItem)
 class MenuItemAdmin(admin.ModelAdmin):
@@ -3,4 +3,7 @@ from django.apps import AppConfig
 class RestaurantConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.restaurant'
-    verbose_name = 'Ресторан'
\ No newline at end of file
+    verbose_name = 'Ресторан'
+    
+    def ready(self):
+        import apps.restaurant.signals
\ No newline at end of file
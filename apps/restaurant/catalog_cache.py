@@ -0,0 +1,110 @@
+"""
+Кэш ответов публичного каталога (зоны, столики, меню).
+
+Ключ ответа строится из нормализованных параметров запроса и версий
+моделей, от которых зависит ответ. Сохранение или удаление записи
+увеличивает версию модели (signals.py), и все ответы с ее участием
+перестают находиться в кэше без явного удаления ключей.
+"""
+import hashlib
+import time
+from django.core.cache import cache
+from rest_framework.response import Response
+from apps.core.conditional import make_etag
+
+CATALOG_CACHE_TIMEOUT = 60 * 60
+CATALOG_VERSION_KEY = 'restaurant:catalog:version:{}'
+CATALOG_RESPONSE_KEY = 'restaurant:catalog:response:{}'
+
+def _version_key(model):
+    return CATALOG_VERSION_KEY.format(model._meta.label_lower)
+
+def _initial_version():
+    # Версия после вытеснения ключа не совпадает с прежними
+    return int(time.time() * 1000)
+
+def catalog_versions(models):
+    """Текущие версии моделей (один запрос к кэшу)"""
+    keys = [_version_key(model) for model in models]
+    versions = cache.get_many(keys)
+    missing = {key: _initial_version() for key in keys if key not in versions}
+    for key, version in missing.items():
+        cache.add(key, version, timeout=None)
+    if missing:
+        versions.update(cache.get_many(list(missing)))
+    return [versions.get(key) for key in keys]
+
+def bump_catalog_version(model):
+    """Сбрасывает закэшированные ответы, зависящие от модели"""
+    key = _version_key(model)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, _initial_version(), timeout=None)
+    except Exception:
+        pass
+
+def normalize_query_params(query_params):
+    """Параметры запроса в каноническом виде: пустые отброшены, ключи и значения отсортированы"""
+    return '&'.join(
+        '{}={}'.format(name, value)
+        for name, values in sorted(query_params.lists())
+        for value in sorted(values)
+        if value != ''
+    )
+
+class CatalogCacheMixin:
+    """
+    Кэширование данных ответа list() для публичных представлений каталога.
+    
+    cache_models — модели, изменение которых делает ответ устаревшим.
+    """
+    
+    cache_models = ()
+    
+    def get_catalog_fingerprint(self, request):
+        """Отпечаток ответа: представление, параметры и версии моделей"""
+        if not hasattr(self, '_catalog_fingerprint'):
+            versions = catalog_versions(self.cache_models)
+            self._catalog_fingerprint = '|'.join([
+                type(self).__name__,
+                request.get_host(),
+                request.path,
+                normalize_query_params(request.query_params),
+                ','.join(str(version) for version in versions),
+            ])
+        return self._catalog_fingerprint
+    
+    def get_catalog_cache_key(self, request):
+        fingerprint = self.get_catalog_fingerprint(request)
+        return CATALOG_RESPONSE_KEY.format(hashlib.md5(fingerprint.encode()).hexdigest())
+    
+    def get_validators(self, request):
+        """ETag по отпечатку каталога (для ConditionalGetMixin), без обращения к БД"""
+        try:
+            return make_etag(self.get_catalog_fingerprint(request)), None
+        except Exception:
+            return None, None
+    
+    def refresh_cached_data(self, data):
+        """Обновление изменчивых во времени полей в данных из кэша"""
+        return data
+    
+    def list(self, request, *args, **kwargs):
+        try:
+            key = self.get_catalog_cache_key(request)
+            data = cache.get(key)
+        except Exception:
+            # Кэш недоступен: отвечаем без него
+            return super().list(request, *args, **kwargs)
+        
+        if data is not None:
+            return Response(self.refresh_cached_data(data))
+        
+        response = super().list(request, *args, **kwargs)
+        if response.status_code == 200:
+            try:
+                cache.set(key, response.data, CATALOG_CACHE_TIMEOUT)
+            except Exception:
+                pass
+        return response
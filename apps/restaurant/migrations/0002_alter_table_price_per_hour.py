@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('restaurant', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='table',
+            name='price_per_hour',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=8, verbose_name='Цена за столик'),
+        ),
+    ]
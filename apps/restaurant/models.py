@@ -2,6 +2,15 @@ from django.db import models
 from django.utils.translation import gettext_lazy as _
 from django.core.validators import MinValueValidator, MaxValueValidator
 
+class ZoneQuerySet(models.QuerySet):
+    """Запросы к зонам"""
+    
+    def with_counts(self):
+        """Аннотация количества активных столиков (без запроса на каждую зону)"""
+        return self.annotate(
+            _active_tables_count=models.Count('tables', filter=models.Q(tables__is_active=True))
+        )
+
 class Zone(models.Model):
     """Зоны ресторана"""
     
@@ -12,6 +21,8 @@ class Zone(models.Model):
     is_active = models.BooleanField(_('Активна'), default=True)
     sort_order = models.PositiveIntegerField(_('Порядок сортировки'), default=0)
     
+    objects = ZoneQuerySet.as_manager()
+    
     class Meta:
         verbose_name = _('Зона')
         verbose_name_plural = _('Зоны')
@@ -19,6 +30,13 @@ class Zone(models.Model):
     
     def __str__(self):
         return self.name
+    
+    @property
+    def active_tables_count(self):
+        """Количество активных столиков"""
+        if hasattr(self, '_active_tables_count'):
+            return self._active_tables_count
+        return self.tables.filter(is_active=True).count()
 
 class Table(models.Model):
     """Столики ресторана"""
@@ -64,21 +82,21 @@ class Table(models.Model):
     @property
     def current_status(self):
         """Текущий статус столика"""
-        from apps.bookings.models import Booking
-        from django.utils import timezone
-        
-        now = timezone.now()
-        current_booking = Booking.objects.filter(
-            table=self,
-            status__in=['confirmed', 'active'],
-            start_time__lte=now,
-            end_time__gte=now
-        ).first()
-        
-        if current_booking:
-            return 'occupied' if current_booking.status == 'active' else 'reserved'
-        
-        return 'available' if self.is_active else 'maintenance'
+        # Для списков статус заранее проставляется пакетно (table_status.resolve_table_statuses)
+        if not hasattr(self, '_current_status'):
+            from .table_status import resolve_table_statuses
+            resolve_table_statuses([self])
+        return self._current_status
+
+class MenuCategoryQuerySet(models.QuerySet):
+    """Запросы к категориям меню"""
+    
+    def with_counts(self):
+        """Аннотация количества блюд и доступных блюд (без запроса на каждую категорию)"""
+        return self.annotate(
+            _items_count=models.Count('items'),
+            _available_items_count=models.Count('items', filter=models.Q(items__is_available=True))
+        )
 
 class MenuCategory(models.Model):
     """Категории меню"""
@@ -90,6 +108,8 @@ class MenuCategory(models.Model):
     is_active = models.BooleanField(_('Активна'), default=True)
     sort_order = models.PositiveIntegerField(_('Порядок сортировки'), default=0)
     
+    objects = MenuCategoryQuerySet.as_manager()
+    
     class Meta:
         verbose_name = _('Категория меню')
         verbose_name_plural = _('Категории меню')
@@ -97,6 +117,20 @@ class MenuCategory(models.Model):
     
     def __str__(self):
         return self.name
+    
+    @property
+    def items_count(self):
+        """Количество блюд в категории"""
+        if hasattr(self, '_items_count'):
+            return self._items_count
+        return self.items.count()
+    
+    @property
+    def available_items_count(self):
+        """Количество доступных для заказа блюд"""
+        if hasattr(self, '_available_items_count'):
+            return self._available_items_count
+        return self.items.filter(is_available=True).count()
 
 class MenuItem(models.Model):
     """Блюда меню"""
@@ -1,16 +1,28 @@
+from django.db import models
 from rest_framework import serializers
+from apps.core.serializers import SparseFieldsMixin
 from .models import Zone, Table, MenuCategory, MenuItem, RestaurantSettings
+from .table_status import resolve_table_statuses
 
 class ZoneSerializer(serializers.ModelSerializer):
     """Сериализатор для зон"""
     
-    tables_count = serializers.IntegerField(source='tables.count', read_only=True)
+    tables_count = serializers.IntegerField(source='active_tables_count', read_only=True)
     
     class Meta:
         model = Zone
         fields = ['id', 'name', 'slug', 'description', 'image', 'is_active', 'sort_order', 'tables_count']
 
-class TableSerializer(serializers.ModelSerializer):
+class TableListSerializer(serializers.ListSerializer):
+    """Список столиков со статусами, вычисленными одним запросом"""
+    
+    def to_representation(self, data):
+        tables = data.all() if isinstance(data, models.Manager) else data
+        if 'current_status' in self.child.fields:
+            tables = resolve_table_statuses(tables)
+        return super().to_representation(tables)
+
+class TableSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Сериализатор для столиков"""
     
     zone_name = serializers.CharField(source='zone.name', read_only=True)
@@ -19,6 +31,8 @@ class TableSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = Table
+        list_serializer_class = TableListSerializer
+        expandable_fields = ['current_status']
         fields = [
             'id', 'name', 'zone', 'zone_name', 'zone_slug', 'capacity', 'min_capacity',
             'description', 'image', 'price_per_hour', 'deposit', 'is_active', 'is_vip',
@@ -56,16 +70,20 @@ class TableSerializer(serializers.ModelSerializer):
         instance.save()
         return instance
 
-class MenuCategorySerializer(serializers.ModelSerializer):
+class MenuCategorySerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Сериализатор для категорий меню"""
     
-    items_count = serializers.IntegerField(source='items.count', read_only=True)
+    items_count = serializers.IntegerField(read_only=True)
+    available_items_count = serializers.IntegerField(read_only=True)
     
     class Meta:
         model = MenuCategory
-        fields = ['id', 'name', 'slug', 'description', 'image', 'is_active', 'sort_order', 'items_count']
+        fields = [
+            'id', 'name', 'slug', 'description', 'image', 'is_active', 'sort_order',
+            'items_count', 'available_items_count'
+        ]
 
-class MenuItemSerializer(serializers.ModelSerializer):
+class MenuItemSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Сериализатор для блюд меню"""
     
     category_name = serializers.CharField(source='category.name', read_only=True)
@@ -125,3 +143,34 @@ class RestaurantSettingsSerializer(serializers.ModelSerializer):
             'cancellation_hours', 'facebook_url', 'instagram_url', 'telegram_url',
             'logo', 'hero_image'
         ]
+
+class FloorPlanQuerySerializer(serializers.Serializer):
+    """Параметры плана зала: момент at или отрезок start..end с шагом step минут"""
+    
+    MAX_TIMELINE_POINTS = 96
+    
+    at = serializers.DateTimeField(required=False)
+    start = serializers.DateTimeField(required=False)
+    end = serializers.DateTimeField(required=False)
+    step = serializers.IntegerField(required=False, default=30, min_value=5, max_value=24 * 60)
+    
+    def validate(self, attrs):
+        start = attrs.get('start')
+        end = attrs.get('end')
+        
+        if attrs.get('at') and (start or end):
+            raise serializers.ValidationError('Укажите либо at, либо start и end')
+        
+        if bool(start) != bool(end):
+            raise serializers.ValidationError('Для временной шкалы нужны и start, и end')
+        
+        if start and end:
+            if end < start:
+                raise serializers.ValidationError('Конец отрезка раньше начала')
+            points = int((end - start).total_seconds() // (attrs['step'] * 60)) + 1
+            if points > self.MAX_TIMELINE_POINTS:
+                raise serializers.ValidationError(
+                    'Слишком много точек временной шкалы (максимум {})'.format(self.MAX_TIMELINE_POINTS)
+                )
+        
+        return attrs
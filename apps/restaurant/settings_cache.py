@@ -0,0 +1,78 @@
+"""
+Кэш настроек ресторана в памяти процесса.
+
+Запись RestaurantSettings хранится в памяти каждого воркера (gunicorn,
+Celery) вместе с номером версии. Номер актуальной версии лежит в общем
+кэше и увеличивается при каждом сохранении настроек. Версия сверяется
+один раз за запрос или задачу, поэтому изменения из админки видны
+со следующего запроса, а БД читается только после изменения.
+"""
+import threading
+from django.core.cache import cache
+from .catalog_cache import _initial_version
+
+SETTINGS_VERSION_KEY = 'restaurant:settings:version'
+
+class _SettingsState:
+    """Закэшированная запись настроек и ее версия"""
+    
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.version = None
+        self.settings = None
+        self.loaded = False
+        self.verified = False
+
+_state = _SettingsState()
+
+def _shared_version():
+    """Актуальная версия из общего кэша (None, если кэш недоступен)"""
+    try:
+        version = cache.get(SETTINGS_VERSION_KEY)
+        if version is None:
+            # После вытеснения ключа версия не должна совпасть с закэшированной в воркерах
+            cache.add(SETTINGS_VERSION_KEY, _initial_version(), timeout=None)
+            version = cache.get(SETTINGS_VERSION_KEY)
+        return version
+    except Exception:
+        return None
+
+def restaurant_settings_version():
+    """Текущая версия настроек (для ETag); None, если общий кэш недоступен"""
+    return _shared_version()
+
+def get_restaurant_settings():
+    """
+    Настройки ресторана (None, если запись еще не создана).
+    
+    Возвращаемый объект общий для всего процесса и не должен изменяться.
+    """
+    from .models import RestaurantSettings
+    
+    with _state.lock:
+        if _state.loaded and _state.verified:
+            return _state.settings
+        
+        version = _shared_version()
+        if not _state.loaded or version is None or version != _state.version:
+            _state.settings = RestaurantSettings.objects.first()
+            _state.version = version
+            _state.loaded = True
+        # Без общего кэша версия не проверяется, и настройки читаются заново
+        _state.verified = version is not None
+        return _state.settings
+
+def expire_restaurant_settings(**kwargs):
+    """Сверить версию настроек при следующем обращении (начало запроса или задачи)"""
+    _state.verified = False
+
+def bump_restaurant_settings_version():
+    """Сообщить всем процессам об изменении настроек"""
+    try:
+        cache.incr(SETTINGS_VERSION_KEY)
+    except ValueError:
+        cache.add(SETTINGS_VERSION_KEY, _initial_version(), timeout=None)
+    except Exception:
+        pass
+    with _state.lock:
+        _state.loaded = False
@@ -0,0 +1,24 @@
+from celery.signals import task_prerun
+from django.core.signals import request_started
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from .catalog_cache import bump_catalog_version
+from .models import Zone, Table, MenuCategory, MenuItem, RestaurantSettings
+from .settings_cache import bump_restaurant_settings_version, expire_restaurant_settings
+
+@receiver([post_save, post_delete], sender=RestaurantSettings)
+def restaurant_settings_changed(sender, instance, **kwargs):
+    """Инвалидация кэша настроек во всех воркерах после фиксации транзакции"""
+    transaction.on_commit(bump_restaurant_settings_version)
+
+@receiver([post_save, post_delete], sender=Zone)
+@receiver([post_save, post_delete], sender=Table)
+@receiver([post_save, post_delete], sender=MenuCategory)
+@receiver([post_save, post_delete], sender=MenuItem)
+def catalog_changed(sender, instance, **kwargs):
+    """Сброс закэшированных ответов каталога, зависящих от модели"""
+    transaction.on_commit(lambda: bump_catalog_version(sender))
+
+request_started.connect(expire_restaurant_settings, dispatch_uid='restaurant_settings_request')
+task_prerun.connect(expire_restaurant_settings, dispatch_uid='restaurant_settings_task')
@@ -0,0 +1,96 @@
+from django.utils import timezone
+
+# Статусы бронирований, занимающих столик в текущий момент
+OCCUPYING_BOOKING_STATUSES = ['confirmed', 'active']
+
+def table_status(is_active, booking_status=None):
+    """Статус столика по статусу его текущего бронирования"""
+    if booking_status:
+        return 'occupied' if booking_status == 'active' else 'reserved'
+    return 'available' if is_active else 'maintenance'
+
+def load_table_bookings(table_ids, start, end):
+    """
+    {table_id: [(start_time, end_time, status)]} бронирований,
+    действующих хотя бы в один момент отрезка [start, end] (один запрос).
+    
+    table_ids=None — по всем столикам.
+    """
+    from apps.bookings.models import Booking
+    
+    bookings = Booking.objects.filter(
+        status__in=OCCUPYING_BOOKING_STATUSES,
+        start_time__lte=end,
+        end_time__gte=start
+    )
+    if table_ids is not None:
+        table_ids = set(table_ids)
+        if not table_ids:
+            return {}
+        bookings = bookings.filter(table_id__in=table_ids)
+    bookings = bookings.order_by('start_time').values_list('table_id', 'start_time', 'end_time', 'status')
+    
+    result = {}
+    for table_id, start_time, end_time, status in bookings:
+        result.setdefault(table_id, []).append((start_time, end_time, status))
+    return result
+
+def booking_status_at(bookings, moment):
+    """Статус бронирования, действующего в момент moment"""
+    status = None
+    # При стыковке бронирований учитывается начавшееся позже
+    for start_time, end_time, booking_status in bookings:
+        if start_time > moment:
+            break
+        if end_time >= moment:
+            status = booking_status
+    return status
+
+def table_statuses(tables_activity, at=None):
+    """{table_id: статус} по парам (table_id, is_active) одним запросом"""
+    tables_activity = list(tables_activity)
+    at = at or timezone.now()
+    bookings = load_table_bookings([table_id for table_id, is_active in tables_activity], at, at)
+    return {
+        table_id: table_status(is_active, booking_status_at(bookings.get(table_id, ()), at))
+        for table_id, is_active in tables_activity
+    }
+
+def resolve_table_statuses(tables, at=None):
+    """Вычисляет current_status для набора столиков одним запросом"""
+    tables = list(tables)
+    statuses = table_statuses(((table.id, table.is_active) for table in tables), at)
+    for table in tables:
+        table._current_status = statuses[table.id]
+    return tables
+
+def table_status_timeline(tables, moments):
+    """
+    {table_id: [статус в каждый из моментов]} для набора столиков.
+    
+    Бронирования загружаются одним запросом на весь отрезок
+    от первого до последнего момента.
+    """
+    tables = list(tables)
+    moments = sorted(moments)
+    if not tables or not moments:
+        return {}
+    
+    bookings = load_table_bookings([table.id for table in tables], moments[0], moments[-1])
+    return {
+        table.id: [
+            table_status(table.is_active, booking_status_at(bookings.get(table.id, ()), moment))
+            for moment in moments
+        ]
+        for table in tables
+    }
+
+def occupancy_fingerprint(start=None, end=None):
+    """Отпечаток бронирований, определяющих статусы столиков на отрезке (для ETag)"""
+    start = start or timezone.now()
+    bookings = load_table_bookings(None, start, end or start)
+    return sorted(
+        (table_id, start_time.isoformat(), end_time.isoformat(), status)
+        for table_id, table_bookings in bookings.items()
+        for start_time, end_time, status in table_bookings
+    )
@@ -0,0 +1,57 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+from .models import Zone, Table, MenuCategory, MenuItem
+
+User = get_user_model()
+
+class CatalogListQueriesTest(TestCase):
+    """Число запросов списков каталога не зависит от числа строк"""
+
+    # URL: число запросов (ответы каталога берутся из БД, кэш очищается)
+    API_QUERIES = {
+        '/api/restaurant/zones/': 1,
+        '/api/restaurant/tables/': 3,
+        '/api/restaurant/menu/categories/': 1,
+        '/api/restaurant/menu/items/': 1,
+    }
+    # Сессия, пользователь, счетчики changelist и фильтры
+    ADMIN_QUERIES = {
+        '/admin/restaurant/zone/': 6,
+        '/admin/restaurant/table/': 9,
+        '/admin/restaurant/menucategory/': 6,
+        '/admin/restaurant/menuitem/': 7,
+    }
+
+    def setUp(self):
+        self.api_client = APIClient()
+        admin = User.objects.create_superuser(email='admin@example.com', username='admin', password='password')
+        self.admin_client = APIClient()
+        self.admin_client.force_login(admin)
+        self._add_rows(1)
+
+    def _add_rows(self, count):
+        offset = Zone.objects.count()
+        for number in range(offset, offset + count):
+            zone = Zone.objects.create(name=f'Зал {number}', slug=f'zone-{number}')
+            Table.objects.create(name=f'Столик {number}', zone=zone, capacity=4, price_per_hour=100)
+            category = MenuCategory.objects.create(name=f'Категория {number}', slug=f'category-{number}')
+            MenuItem.objects.create(category=category, name=f'Блюдо {number}', slug=f'dish-{number}', price=10)
+
+    def _assert_queries(self, client, expected):
+        for url, queries in expected.items():
+            cache.clear()
+            with self.subTest(url=url), self.assertNumQueries(queries):
+                response = client.get(url)
+                self.assertEqual(response.status_code, 200)
+
+    def test_api_lists(self):
+        self._assert_queries(self.api_client, self.API_QUERIES)
+        self._add_rows(5)
+        self._assert_queries(self.api_client, self.API_QUERIES)
+
+    def test_admin_changelists(self):
+        self._assert_queries(self.admin_client, self.ADMIN_QUERIES)
+        self._add_rows(5)
+        self._assert_queries(self.admin_client, self.ADMIN_QUERIES)
@@ -3,26 +3,33 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.filters import SearchFilter, OrderingFilter
-from django.db.models import Count, Sum
+from django.db.models import Count, Prefetch, Q, Sum
 from django.utils import timezone
 from datetime import timedelta
+from apps.core.conditional import ConditionalGetMixin, conditional_response, make_etag, set_validators
+from apps.core.eager_loading import EagerLoadingMixin
+from apps.core.streaming import StreamingListMixin
 from .models import Zone, Table, MenuCategory, MenuItem, RestaurantSettings
+from .catalog_cache import CatalogCacheMixin, catalog_versions, normalize_query_params
+from .settings_cache import get_restaurant_settings, restaurant_settings_version
+from .table_status import occupancy_fingerprint, resolve_table_statuses, table_statuses, table_status_timeline
 from .serializers import (
     ZoneSerializer, TableSerializer, MenuCategorySerializer, 
-    MenuItemSerializer, RestaurantSettingsSerializer
+    MenuItemSerializer, RestaurantSettingsSerializer, FloorPlanQuerySerializer
 )
 
-class ZoneListView(generics.ListAPIView):
+class ZoneListView(ConditionalGetMixin, CatalogCacheMixin, EagerLoadingMixin, generics.ListAPIView):
     """Список зон ресторана"""
     
-    queryset = Zone.objects.filter(is_active=True)
+    queryset = Zone.objects.filter(is_active=True).with_counts()
     serializer_class = ZoneSerializer
     permission_classes = [permissions.AllowAny]
+    cache_models = (Zone, Table)
 
-class TableListView(generics.ListAPIView):
+class TableListView(ConditionalGetMixin, StreamingListMixin, CatalogCacheMixin, EagerLoadingMixin, generics.ListAPIView):
     """Список столиков"""
     
-    queryset = Table.objects.filter(is_active=True).select_related('zone')
+    queryset = Table.objects.filter(is_active=True)
     serializer_class = TableSerializer
     permission_classes = [permissions.AllowAny]
     filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
@@ -30,11 +37,28 @@ class TableListView(generics.ListAPIView):
     search_fields = ['name', 'description']
     ordering_fields = ['name', 'capacity', 'price_per_hour']
     ordering = ['zone', 'name']
+    cache_models = (Table, Zone)
+    
+    def get_validators(self, request):
+        etag, last_modified = super().get_validators(request)
+        if etag is not None:
+            # Статусы столиков меняются без изменения самих столиков
+            etag = make_etag(etag, occupancy_fingerprint())
+        return etag, last_modified
+    
+    def refresh_cached_data(self, data):
+        """Статус столика зависит от времени: пересчитывается одним запросом"""
+        rows = [row for row in data if 'current_status' in row and 'id' in row]
+        if rows:
+            statuses = table_statuses((row['id'], row.get('is_active', True)) for row in rows)
+            for row in rows:
+                row['current_status'] = statuses[row['id']]
+        return data
 
-class TableDetailView(generics.RetrieveUpdateDestroyAPIView):
+class TableDetailView(EagerLoadingMixin, generics.RetrieveUpdateDestroyAPIView):
     """Детали, обновление и удаление столика"""
     
-    queryset = Table.objects.select_related('zone')
+    queryset = Table.objects.all()
     serializer_class = TableSerializer
     permission_classes = [permissions.IsAdminUser]
     lookup_field = 'id'
@@ -107,17 +131,18 @@ class TableDetailView(generics.RetrieveUpdateDestroyAPIView):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
-class MenuCategoryListView(generics.ListAPIView):
+class MenuCategoryListView(ConditionalGetMixin, CatalogCacheMixin, EagerLoadingMixin, generics.ListAPIView):
     """Список категорий меню"""
     
-    queryset = MenuCategory.objects.filter(is_active=True)
+    queryset = MenuCategory.objects.filter(is_active=True).with_counts()
     serializer_class = MenuCategorySerializer
     permission_classes = [permissions.AllowAny]
+    cache_models = (MenuCategory, MenuItem)
 
-class MenuItemListView(generics.ListAPIView):
+class MenuItemListView(ConditionalGetMixin, CatalogCacheMixin, EagerLoadingMixin, generics.ListAPIView):
     """Список блюд меню"""
     
-    queryset = MenuItem.objects.filter(is_available=True).select_related('category')
+    queryset = MenuItem.objects.filter(is_available=True)
     serializer_class = MenuItemSerializer
     permission_classes = [permissions.AllowAny]
     filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
@@ -127,11 +152,12 @@ class MenuItemListView(generics.ListAPIView):
     search_fields = ['name', 'description', 'ingredients']
     ordering_fields = ['name', 'price', 'cooking_time']
     ordering = ['category', 'sort_order', 'name']
+    cache_models = (MenuItem, MenuCategory)
 
-class MenuItemDetailView(generics.RetrieveUpdateDestroyAPIView):
+class MenuItemDetailView(EagerLoadingMixin, generics.RetrieveUpdateDestroyAPIView):
     """Детали, обновление и удаление блюда"""
     
-    queryset = MenuItem.objects.select_related('category')
+    queryset = MenuItem.objects.all()
     serializer_class = MenuItemSerializer
     permission_classes = [permissions.IsAdminUser]
     lookup_field = 'id'
@@ -199,13 +225,23 @@ class MenuItemDetailView(generics.RetrieveUpdateDestroyAPIView):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
-class RestaurantSettingsView(generics.RetrieveAPIView):
+class RestaurantSettingsView(ConditionalGetMixin, generics.RetrieveAPIView):
     """Настройки ресторана"""
     
     serializer_class = RestaurantSettingsSerializer
     permission_classes = [permissions.AllowAny]
     
+    def get_validators(self, request):
+        version = restaurant_settings_version()
+        if version is None:
+            return None, None
+        return make_etag('restaurant-settings', version, request.get_host()), None
+    
     def get_object(self):
+        settings = get_restaurant_settings()
+        if settings is not None:
+            return settings
+        
         settings, created = RestaurantSettings.objects.get_or_create(
             defaults={
                 'name': 'Ресторан "LOGAN"',
@@ -224,19 +260,24 @@ def dashboard_stats(request):
     today = timezone.now().date()
     month_start = today.replace(day=1)
     
-    from apps.bookings.models import Booking
+    from apps.bookings.models import BookingDailyStats
     from apps.accounts.models import User
     
+    # Показатели бронирований — одним запросом по дневной сводке
+    booking_totals = BookingDailyStats.objects.aggregate(
+        today_bookings=Sum('bookings_count', filter=Q(date=today)),
+        monthly_revenue=Sum('revenue', filter=Q(date__gte=month_start, status='completed')),
+        pending_bookings=Sum('bookings_count', filter=Q(status='pending')),
+        confirmed_bookings=Sum('bookings_count', filter=Q(status='confirmed')),
+    )
+    
     stats = {
-        'today_bookings': Booking.objects.filter(date=today).count(),
+        'today_bookings': booking_totals['today_bookings'] or 0,
         'total_users': User.objects.count(),
         'active_tables': Table.objects.filter(is_active=True).count(),
-        'monthly_revenue': Booking.objects.filter(
-            date__gte=month_start,
-            status='completed'
-        ).aggregate(total=Sum('total_amount'))['total'] or 0,
-        'pending_bookings': Booking.objects.filter(status='pending').count(),
-        'confirmed_bookings': Booking.objects.filter(status='confirmed').count(),
+        'monthly_revenue': booking_totals['monthly_revenue'] or 0,
+        'pending_bookings': booking_totals['pending_bookings'] or 0,
+        'confirmed_bookings': booking_totals['confirmed_bookings'] or 0,
     }
     
     return Response(stats)
@@ -244,11 +285,62 @@ def dashboard_stats(request):
 @api_view(['GET'])
 @permission_classes([permissions.AllowAny])
 def floor_plan(request):
-    """План зала с расположением столиков"""
+    """
+    План зала с расположением столиков.
+    
+    По умолчанию статусы на текущий момент. Параметр at показывает
+    план на произвольный момент, параметры start, end и step (минуты)
+    добавляют каждому столику временную шкалу статусов.
+    """
+    serializer = FloorPlanQuerySerializer(data=request.GET)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    
+    start = serializer.validated_data.get('start')
+    end = serializer.validated_data.get('end')
+    at = serializer.validated_data.get('at') or start or timezone.now()
+    
+    # Слабый ETag: план совпадает по смыслу, даже если поле at другое
+    try:
+        versions = catalog_versions((Zone, Table))
+    except Exception:
+        versions = None
+    etag = None
+    if versions is not None:
+        etag = make_etag(
+            request.get_host(),
+            normalize_query_params(request.GET),
+            versions,
+            occupancy_fingerprint(at, end),
+            weak=True
+        )
+        not_modified = conditional_response(request, etag)
+        if not_modified is not None:
+            return not_modified
+    
+    zones = Zone.objects.filter(is_active=True).prefetch_related(
+        Prefetch('tables', queryset=Table.objects.filter(is_active=True), to_attr='active_tables')
+    )
+    tables = [table for zone in zones for table in zone.active_tables]
     
-    zones = Zone.objects.filter(is_active=True).prefetch_related('tables')
+    moments = []
+    timelines = {}
+    if start:
+        step = timedelta(minutes=serializer.validated_data['step'])
+        moment = start
+        while moment <= end:
+            moments.append(moment)
+            moment += step
+        # Весь отрезок — одним запросом, статус на начало берется из шкалы
+        timelines = table_status_timeline(tables, moments)
+        for table in tables:
+            table._current_status = timelines[table.id][0]
+    else:
+        # Статусы всех столиков плана — одним запросом
+        resolve_table_statuses(tables, at)
     
     floor_plan_data = {
+        'at': timezone.localtime(at).isoformat(),
         'zones': [],
         'tables': []
     }
@@ -263,7 +355,7 @@ def floor_plan(request):
         }
         floor_plan_data['zones'].append(zone_data)
         
-        for table in zone.tables.filter(is_active=True):
+        for table in zone.active_tables:
             table_data = {
                 'id': table.id,
                 'name': table.name,
@@ -276,6 +368,11 @@ def floor_plan(request):
                 'is_vip': table.is_vip,
                 'features': table.features,
             }
+            if moments:
+                table_data['timeline'] = [
+                    {'time': timezone.localtime(moment).isoformat(), 'status': table_status}
+                    for moment, table_status in zip(moments, timelines[table.id])
+                ]
             floor_plan_data['tables'].append(table_data)
     
-    return Response(floor_plan_data)
+    return set_validators(Response(floor_plan_data), etag)
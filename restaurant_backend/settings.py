@@ -1,6 +1,7 @@
 import os
+import sys
 from pathlib import Path
-from decouple import config
+from decouple import Csv, config
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -13,6 +14,9 @@ DEBUG = config('DEBUG', default=True, cast=bool)
 
 ALLOWED_HOSTS = config('ALLOWED_HOSTS', default='localhost,127.0.0.1', cast=lambda v: [s.strip() for s in v.split(',')])
 
+# Ключ перестановки номеров бронирований (не менять после запуска: от него зависят выданные коды)
+BOOKING_NUMBER_KEY = config('BOOKING_NUMBER_KEY', default=SECRET_KEY)
+
 # Frontend URL for email links
 FRONTEND_URL = config('FRONTEND_URL', default='http://localhost:3000')
 
@@ -24,6 +28,7 @@ DJANGO_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
 ]
 
 THIRD_PARTY_APPS = [
@@ -141,7 +146,12 @@ REST_FRAMEWORK = {
         'rest_framework.filters.OrderingFilter',
     ],
     'DEFAULT_RENDERER_CLASSES': [
-        'rest_framework.renderers.JSONRenderer',
+        'apps.core.renderers.FastJSONRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'apps.core.parsers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
     ],
 }
 
@@ -195,17 +205,71 @@ CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = TIME_ZONE
 
+# Outbox уведомлений: размер пачки, интервал передачи в Celery (с),
+# срок хранения переданных строк; DIRECT - выполнять задачи прямо во флашере
+NOTIFICATION_OUTBOX_BATCH_SIZE = config('NOTIFICATION_OUTBOX_BATCH_SIZE', default=200, cast=int)
+NOTIFICATION_OUTBOX_FLUSH_INTERVAL = config('NOTIFICATION_OUTBOX_FLUSH_INTERVAL', default=5, cast=float)
+NOTIFICATION_OUTBOX_RETENTION_DAYS = config('NOTIFICATION_OUTBOX_RETENTION_DAYS', default=7, cast=int)
+NOTIFICATION_OUTBOX_DIRECT = config('NOTIFICATION_OUTBOX_DIRECT', default=False, cast=bool)
+# Окно (с), в котором быстрые смены статуса бронирования схлопываются в одно уведомление
+NOTIFICATION_COALESCE_WINDOW = config('NOTIFICATION_COALESCE_WINDOW', default=30, cast=float)
+
+# Напоминания о бронированиях: за сколько минут до начала и как часто проверять
+BOOKING_REMINDER_OFFSETS = config('BOOKING_REMINDER_OFFSETS', default='1440,120', cast=Csv(int))
+BOOKING_REMINDER_INTERVAL = config('BOOKING_REMINDER_INTERVAL', default=60, cast=float)
+
+CELERY_BEAT_SCHEDULE = {
+    'flush-notification-outbox': {
+        'task': 'apps.bookings.tasks.flush_notification_outbox',
+        'schedule': NOTIFICATION_OUTBOX_FLUSH_INTERVAL,
+    },
+    'dispatch-booking-reminders': {
+        'task': 'apps.bookings.tasks.dispatch_booking_reminders',
+        'schedule': BOOKING_REMINDER_INTERVAL,
+    },
+}
+
+# Cache (общий для всех воркеров Django и Celery). Для разработки
+# без Redis: CACHE_BACKEND=django.core.cache.backends.locmem.LocMemCache
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.redis.RedisCache'),
+        'LOCATION': config('REDIS_CACHE_URL', default='redis://localhost:6379/1'),
+    }
+}
+
+# Тесты всегда работают с кэшем в памяти процесса: Redis не нужен,
+# а cache.clear() в тестах не стирает общие данные
+if sys.argv[1:2] == ['test']:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
 # Email settings
-EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
+EMAIL_BACKEND = config('EMAIL_BACKEND', default='django.core.mail.backends.smtp.EmailBackend')
+EMAIL_FILE_PATH = config('EMAIL_FILE_PATH', default=str(BASE_DIR / 'logs' / 'emails'))
 EMAIL_HOST = config('EMAIL_HOST', default='smtp.gmail.com')
 EMAIL_PORT = config('EMAIL_PORT', default=587, cast=int)
 EMAIL_USE_TLS = config('EMAIL_USE_TLS', default=True, cast=bool)
 EMAIL_HOST_USER = config('EMAIL_HOST_USER', default='')
 EMAIL_HOST_PASSWORD = config('EMAIL_HOST_PASSWORD', default='')
 DEFAULT_FROM_EMAIL = config('DEFAULT_FROM_EMAIL', default='noreply@restaurant-logan.com')
+# Размер порции писем (и пачки напоминаний), отправляемых через одно SMTP-соединение
+MAIL_BATCH_SIZE = config('MAIL_BATCH_SIZE', default=50, cast=int)
 
 # SMS settings
 SMS_API_TOKEN = config('SMS_API_TOKEN', default='')
+SMS_BACKEND = config('SMS_BACKEND', default='apps.bookings.sms.EskizSMSProvider')
+SMS_SENDER = config('SMS_SENDER', default='4546')
+# Квота провайдера: сообщений в секунду и допустимый всплеск (общие для всех воркеров, через кэш)
+SMS_RATE_LIMIT = config('SMS_RATE_LIMIT', default=5, cast=float)
+SMS_RATE_BURST = config('SMS_RATE_BURST', default=100, cast=int)
+SMS_BATCH_SIZE = config('SMS_BATCH_SIZE', default=100, cast=int)
+SMS_POOL_SIZE = config('SMS_POOL_SIZE', default=4, cast=int)
+SMS_CONNECT_TIMEOUT = config('SMS_CONNECT_TIMEOUT', default=3.05, cast=float)
+SMS_READ_TIMEOUT = config('SMS_READ_TIMEOUT', default=10, cast=float)
 
 # Payment settings
 CLICK_MERCHANT_ID = config('CLICK_MERCHANT_ID', default='')
@@ -215,7 +279,9 @@ CLICK_SECRET_KEY = config('CLICK_SECRET_KEY', default='')
 PAYME_MERCHANT_ID = config('PAYME_MERCHANT_ID', default='')
 PAYME_SECRET_KEY = config('PAYME_SECRET_KEY', default='')
 
-# Logging
+# Logging (каталог logs/ не хранится в репозитории)
+os.makedirs(BASE_DIR / 'logs', exist_ok=True)
+
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
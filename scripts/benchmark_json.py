@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Сравнение скорости JSONRenderer и FastJSONRenderer на типичных ответах API
+
+Запуск: python scripts/benchmark_json.py [--rows 500] [--repeat 20]
+"""
+
+import argparse
+import os
+import sys
+import timeit
+import uuid
+from datetime import timedelta
+from decimal import Decimal
+
+# Добавляем корневую директорию проекта в Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Настраиваем Django
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'restaurant_backend.settings')
+import django
+django.setup()
+
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from rest_framework.renderers import JSONRenderer
+from apps.core.renderers import FastJSONRenderer, orjson
+
+def menu_payload(rows):
+    """Меню: блюда с аллергенами и ценами"""
+    return [
+        {
+            'id': index,
+            'category': index % 8,
+            'category_name': 'Горячие блюда',
+            'name': 'Плов по-ташкентски {}'.format(index),
+            'slug': 'plov-{}'.format(index),
+            'description': 'Рис, баранина, морковь, нут, специи. ' * 3,
+            'price': Decimal('45000.00') + index,
+            'weight': 350,
+            'calories': 780,
+            'is_available': True,
+            'allergens': ['глютен', 'кунжут', 'орехи'][:index % 4],
+            'created_at': timezone.now(),
+        }
+        for index in range(rows)
+    ]
+
+def floor_plan_payload(rows):
+    """План зала с временной шкалой статусов"""
+    now = timezone.now()
+    return {
+        'at': now.isoformat(),
+        'zones': [{'id': zone, 'name': 'Зона {}'.format(zone), 'slug': 'zone-{}'.format(zone)} for zone in range(4)],
+        'tables': [
+            {
+                'id': index,
+                'name': 'Столик {}'.format(index),
+                'zone_id': index % 4,
+                'capacity': 4,
+                'position_x': index * 10,
+                'position_y': index * 5,
+                'status': 'available',
+                'features': ['окно', 'диван'],
+                'timeline': [
+                    {'time': (now + timedelta(minutes=30 * step)).isoformat(), 'status': 'reserved'}
+                    for step in range(16)
+                ],
+            }
+            for index in range(rows // 4 or 1)
+        ],
+    }
+
+def bookings_payload(rows):
+    """Список бронирований: Decimal, datetime, UUID и ленивые строки"""
+    now = timezone.now()
+    return [
+        {
+            'id': index,
+            'booking_number': 'B{:07d}'.format(index),
+            'start_time': now + timedelta(hours=index),
+            'end_time': now + timedelta(hours=index + 2),
+            'date': (now + timedelta(hours=index)).date(),
+            'status': 'confirmed',
+            'status_display': _('Подтверждено'),
+            'guests_count': 4,
+            'table_price': Decimal('120000.00'),
+            'deposit_amount': Decimal('36000.00'),
+            'total_amount': Decimal('310500.50'),
+            'email_confirmation_token': uuid.uuid4(),
+            'menu_items': [
+                {'id': item, 'quantity': 2, 'price_per_item': Decimal('45000.00'), 'notes': ''}
+                for item in range(3)
+            ],
+        }
+        for index in range(rows)
+    ]
+
+def bench(renderer, payload, repeat):
+    renderer.render(payload)
+    return min(timeit.repeat(lambda: renderer.render(payload), number=1, repeat=repeat))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=500, help='Количество строк в ответе')
+    parser.add_argument('--repeat', type=int, default=20, help='Количество повторов (берется лучшее время)')
+    args = parser.parse_args()
+    
+    if orjson is None:
+        print('orjson не установлен: FastJSONRenderer использует стандартный JSONRenderer')
+    
+    standard, fast = JSONRenderer(), FastJSONRenderer()
+    print('{:<12} {:>10} {:>14} {:>14} {:>9}'.format('Ответ', 'Байт', 'JSONRenderer', 'FastJSON', 'Ускорение'))
+    for name, build in [('menu', menu_payload), ('floor_plan', floor_plan_payload), ('bookings', bookings_payload)]:
+        payload = build(args.rows)
+        size = len(standard.render(payload))
+        standard_time = bench(standard, payload, args.repeat)
+        fast_time = bench(fast, payload, args.repeat)
+        print('{:<12} {:>10} {:>11.2f} мс {:>11.2f} мс {:>8.1f}x'.format(
+            name, size, standard_time * 1000, fast_time * 1000, standard_time / fast_time
+        ))
+
+if __name__ == '__main__':
+    main()
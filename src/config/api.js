@@ -46,6 +46,8 @@ export const API_ENDPOINTS = {
     statistics: "/api/bookings/statistics/",
     confirmEmail: "/api/bookings/confirm-email/",
     createPayment: (bookingId) => `/api/bookings/${bookingId}/payment/`,
+    history: "/api/bookings/history/",
+    payments: "/api/bookings/payments/",
   },
   reviews: {
     list: "/api/reviews/",
@@ -58,7 +58,12 @@ const AdminDashboard = () => {
       ])
 
       // Убеждаемся, что все данные являются массивами
-      const bookingsArray = Array.isArray(bookingsData) ? bookingsData : []
+      // Список бронирований приходит постранично (курсорная пагинация)
+      const bookingsArray = Array.isArray(bookingsData)
+        ? bookingsData
+        : Array.isArray(bookingsData?.results)
+          ? bookingsData.results
+          : []
       const tablesArray = Array.isArray(tablesData) ? tablesData : []
       const usersArray = Array.isArray(usersData) ? usersData : []
       const menuArray = Array.isArray(menuData) ? menuData : []
@@ -37,7 +37,12 @@ const StaffDashboard = () => {
       ])
 
       // Убеждаемся, что данные являются массивами
-      const bookingsArray = Array.isArray(bookingsData) ? bookingsData : []
+      // Список бронирований приходит постранично (курсорная пагинация)
+      const bookingsArray = Array.isArray(bookingsData)
+        ? bookingsData
+        : Array.isArray(bookingsData?.results)
+          ? bookingsData.results
+          : []
       const tablesArray = Array.isArray(tablesData) ? tablesData : []
 
       setBookings(bookingsArray)